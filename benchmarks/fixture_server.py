@@ -0,0 +1,115 @@
+"""
+Local HTTP fixture site for offline benchmarks: a search page and a results page padded
+with synthetic content of controllable size and complexity.
+
+    python benchmarks/fixture_server.py --port 8765
+    http://127.0.0.1:8765/?nodes=2000&depth=6&seed=1
+    http://127.0.0.1:8765/results?q=shoes&nodes=500
+
+`nodes` is the number of filler product cards, `depth` how deeply each card is nested,
+`seed` makes the generated words reproducible. Same parameters, same bytes.
+"""
+import argparse
+import html
+import random
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WORDS = ("alpha", "basket", "cotton", "delivery", "express", "fabric", "garden", "harbor", "indigo",
+         "jacket", "kettle", "linen", "marble", "nordic", "olive", "pocket", "quartz", "ribbon",
+         "summer", "timber", "urban", "velvet", "winter", "yellow", "zephyr")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<title>{title}</title>
+<style>.card {{ padding: 4px; }} .hidden {{ display: none; }}</style>
+<script>window.analytics = {{ "page": "{title}", "cards": {nodes} }};</script>
+</head>
+<body>
+<nav><a href="/">Home</a> <a href="/deals">Deals</a> <a href="/account">Account</a></nav>
+<form action="/results" method="get" role="search">
+  <label for="q">Search products</label>
+  <input id="q" name="q" type="text" placeholder="Search" value="{query}">
+  <button type="submit" data-testid="search-button">Search</button>
+</form>
+<main>
+{main}
+</main>
+<div class="hidden" style="display:none"><p>Newsletter popup</p></div>
+<footer><p>Fixture site for offline benchmarks</p></footer>
+</body>
+</html>
+"""
+
+
+def _card(rng: random.Random, index: int, depth: int, css_class: str = "card", text: str = "") -> str:
+    words = " ".join(rng.choice(WORDS) for _ in range(6))
+    inner = (f'<h3>{text or words.title()}</h3><p>{words}</p>'
+             f'<button data-testid="add-to-cart-{index}">Add to cart</button>')
+    for level in range(depth):
+        inner = f'<div class="level-{level}">{inner}</div>'
+    return f'<article class="{css_class}" id="item-{index}">{inner}</article>'
+
+
+def render_page(nodes: int = 200, depth: int = 4, seed: int = 0, query: str = "") -> str:
+    """The search page, or the results page for `query`, with `nodes` filler cards."""
+    rng = random.Random(seed)
+    parts = []
+    if query:
+        safe_query = html.escape(query)
+        parts.append(f"<h2>Results for {safe_query}</h2>")
+        parts.extend(_card(rng, i, depth, "result", f"{safe_query} {rng.choice(WORDS)}") for i in range(10))
+    parts.extend(_card(rng, i, depth) for i in range(10 if query else 0, nodes))
+    return PAGE_TEMPLATE.format(title="Results" if query else "Shop", nodes=nodes,
+                                query=html.escape(query), main="\n".join(parts))
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        try:
+            nodes, depth, seed = int(params.get("nodes", 200)), int(params.get("depth", 4)), int(params.get("seed", 0))
+        except ValueError:
+            self.send_error(400, "nodes, depth and seed must be integers")
+            return
+        query = params.get("q", "") if url.path == "/results" else ""
+        body = render_page(nodes, depth, seed, query).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def fixture_server(host: str = "127.0.0.1", port: int = 0):
+    """Serve the fixture site on a background thread; yields its base URL (port 0 picks a free one)."""
+    server = ThreadingHTTPServer((host, port), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture site")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), FixtureHandler)
+    print(f"Serving fixture site on http://{args.host}:{args.port}/")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
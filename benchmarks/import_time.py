@@ -0,0 +1,100 @@
+"""
+Import-time benchmark: cold-start cost of the CLI and both pipelines, like `python -X importtime`.
+
+    python benchmarks/import_time.py                 # check every gated module against its budget
+    python benchmarks/import_time.py --budget-ms 200 --module config
+
+Only the import of the module itself is timed, not the interpreter's own startup (site, encodings).
+Exits non-zero when a module takes longer than its budget, or when it imports a module that
+must stay lazy for it (LangChain, LangGraph, Selenium, pandas, ...).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+DEFAULT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 150))
+LAZY_MODULES = ("langchain", "langchain_core", "langchain_groq", "langgraph", "selenium", "pandas", "bs4",
+                "pydantic", "playwright", "pyarrow")
+
+# module -> (budget in ms, modules it must not import)
+GATED_MODULES = {
+    "cli": (DEFAULT_BUDGET_MS, LAZY_MODULES),
+    "config": (DEFAULT_BUDGET_MS, LAZY_MODULES),
+    # The test-plan pipeline defers LangChain, LangGraph, pydantic and asyncio until a plan is generated
+    "generate_test_plan": (DEFAULT_BUDGET_MS, LAZY_MODULES),
+    # The E2E graph is built from LangGraph, LangChain and Selenium nodes, so importing it loads them
+    # (about 1.2-1.8 s); the budget catches new heavy imports on top, and the optional backends and
+    # exporters must still stay lazy
+    "workflow": (float(os.getenv("WORKFLOW_IMPORT_BUDGET_MS", 2500)), ("pandas", "playwright", "pyarrow")),
+}
+
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> dict:
+    """Import `module` in a fresh interpreter with -X importtime and parse the report."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({"name": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us),
+                            "depth": len(indent) // 2})
+    # Children are reported before their parent: the module's own entry is the last top-level one,
+    # and everything after the previous top-level entry (interpreter startup) was imported by it
+    end = max(i for i, e in enumerate(entries) if e["depth"] == 0 and e["name"] == module)
+    start = max((i for i, e in enumerate(entries[:end]) if e["depth"] == 0), default=-1) + 1
+    imported = entries[start:end + 1]
+    return {
+        "total_ms": entries[end]["cumulative_us"] / 1000,
+        "slowest": sorted((e for e in imported if e["depth"] == 1), key=lambda e: -e["cumulative_us"])[:10],
+        "modules": {e["name"] for e in imported},
+    }
+
+
+def check(module: str, budget_ms: float, lazy: tuple, repeat: int) -> bool:
+    """Print the module's median import time and slowest imports; False if it breaks its budget."""
+    runs = [measure(module) for _ in range(repeat)]
+    median_ms = statistics.median(run["total_ms"] for run in runs)
+    print(f"import {module}: median {median_ms:.1f} ms over {repeat} runs (budget {budget_ms:.0f} ms)")
+    for entry in runs[-1]["slowest"]:
+        print(f"  {entry['cumulative_us'] / 1000:8.1f} ms  {entry['name']}")
+
+    eager = sorted({m.split(".")[0] for m in runs[-1]["modules"]} & set(lazy))
+    ok = True
+    if eager:
+        print(f"FAIL: {module} imports heavy modules at startup: {', '.join(eager)}")
+        ok = False
+    if median_ms > budget_ms:
+        print(f"FAIL: import {module} took {median_ms:.1f} ms, over its budget of {budget_ms:.0f} ms")
+        ok = False
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", action="append", help="Module to check (repeatable; default: all gated modules)")
+    parser.add_argument("--budget-ms", type=float, help="Budget for every checked module instead of its own")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs to take the median over")
+    args = parser.parse_args()
+
+    results = []
+    for module in args.module or list(GATED_MODULES):
+        budget_ms, lazy = GATED_MODULES.get(module, (DEFAULT_BUDGET_MS, LAZY_MODULES))
+        results.append(check(module, args.budget_ms or budget_ms, lazy, args.repeat))
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Offline benchmark suite: no Groq, no public internet.
+
+    python benchmarks/run_benchmarks.py                        # every benchmark
+    python benchmarks/run_benchmarks.py dom script             # only some
+    python benchmarks/run_benchmarks.py --output bench.json    # save results ...
+    python benchmarks/run_benchmarks.py --compare bench.json   # ... and compare a later commit
+
+The LLM is replaced by fake_llm.FakeChatModel (canned responses, --llm-latency-ms per call)
+and every page comes from the local fixture site (benchmarks/fixture_server.py).
+The workflow and batch benchmarks drive a real headless Chrome and are skipped when none starts.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT_DIR, "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarks must never touch the response cache, write traces or need an API key
+os.environ["LLM_CACHE_MODE"] = "off"
+os.environ.setdefault("TRACE_DIR", "")
+
+from fixture_server import fixture_server, render_page  # noqa: E402
+
+BENCHMARKS = ("dom", "script", "workflow", "batch")
+DOM_SIZES = (100, 1000, 5000)
+SCRIPT_SIZES = (5, 20, 100)
+QUERY = "Search for 'shoes' and verify that results appear"
+
+
+def _timeit(fn, repeat: int) -> dict:
+    """Median and min wall time of `repeat` calls, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3)}
+
+
+def bench_dom(args) -> dict:
+    """extract_relevant_dom_helper on synthetic pages: first call (parse) and repeated calls (cached index)."""
+    import dom_index
+    from dom_parser import extract_relevant_dom_helper
+    from fake_llm import E2E_RESPONSES
+
+    actions = json.loads(E2E_RESPONSES[0][1])["actions"]
+    results = {}
+    for nodes in DOM_SIZES:
+        page = render_page(nodes=nodes, depth=args.depth, seed=1)
+
+        def cold():
+            dom_index._index_cache.clear()
+            for action in actions:
+                extract_relevant_dom_helper(page, action)
+
+        def warm():
+            for action in actions:
+                extract_relevant_dom_helper(page, action)
+
+        results[f"nodes={nodes}"] = {
+            "dom_bytes": len(page),
+            "minimal_dom_bytes": len(extract_relevant_dom_helper(page, actions[1])),
+            "cold": _timeit(cold, args.repeat),
+            "warm": _timeit(warm, args.repeat),
+        }
+    return results
+
+
+def bench_script(args) -> dict:
+    """Rendering the Selenium script and the pytest module from N action blocks."""
+    from script_builder import make_action_block, previous_actions_context, render_script, render_test_module
+
+    results = {}
+    for count in SCRIPT_SIZES:
+        blocks = [make_action_block(i, f'driver.find_element(By.ID, "field-{i}").send_keys("value {i}")',
+                                    f"Type value {i} in field {i}") for i in range(count)]
+
+        def assemble():
+            for index in range(count):
+                render_script("http://127.0.0.1/", blocks[:index])
+                previous_actions_context(blocks[:index])
+            render_test_module("http://127.0.0.1/", blocks, "test_benchmark")
+
+        results[f"blocks={count}"] = _timeit(assemble, args.repeat)
+    return results
+
+
+def _browser_available() -> str:
+    """Empty string when a pooled headless Chrome starts, otherwise why not."""
+    from driver_pool import get_pool
+    try:
+        with get_pool().lease(timeout=60):
+            return ""
+    except Exception as e:
+        return f"{type(e).__name__}: {e}".splitlines()[0]
+
+
+def bench_workflow(args, base_url: str) -> dict:
+    """The full run_workflow graph against the fixture search page, one scenario at a time."""
+    from workflow import run_workflow
+
+    target_url = f"{base_url}/?nodes={args.nodes}&depth={args.depth}"
+    timings, statuses = [], []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        result = asyncio.run(run_workflow(QUERY, target_url))
+        timings.append(time.perf_counter() - started)
+        statuses.append((result.get("test_result") or {}).get("status"))
+    return {
+        "median_s": round(statistics.median(timings), 3),
+        "min_s": round(min(timings), 3),
+        "statuses": statuses,
+    }
+
+
+def bench_batch(args, base_url: str) -> dict:
+    """Batch throughput: --scenarios copies of the search scenario at --concurrency."""
+    from batch_runner import run_batch
+
+    with tempfile.TemporaryDirectory() as workdir:
+        manifest = os.path.join(workdir, "scenarios.jsonl")
+        with open(manifest, "w", encoding="utf-8") as f:
+            for i in range(args.scenarios):
+                target_url = f"{base_url}/?nodes={args.nodes}&depth={args.depth}&seed={i}"
+                f.write(json.dumps({"id": i, "query": QUERY, "target_url": target_url}) + "\n")
+        started = time.perf_counter()
+        results = asyncio.run(run_batch(manifest, os.path.join(workdir, "results.jsonl"), args.concurrency))
+        elapsed = time.perf_counter() - started
+    return {
+        "scenarios": args.scenarios,
+        "concurrency": args.concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "scenarios_per_min": round(args.scenarios / elapsed * 60, 2),
+        "ok": sum(r["status"] == "ok" for r in results),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Print every timing metric of both runs side by side with the relative change."""
+    old, new = _flatten(baseline["results"]), _flatten(current["results"])
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    for name in sorted(set(old) & set(new)):
+        if not name.endswith(("_ms", "_s", "_per_min")) or not old[name]:
+            continue
+        change = (new[name] - old[name]) / old[name] * 100
+        print(f"  {name:45s} {old[name]:>10} -> {new[name]:>10}  ({change:+.1f}%)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Simulated latency of each LLM call")
+    parser.add_argument("--nodes", type=int, default=500, help="Filler cards on fixture pages")
+    parser.add_argument("--depth", type=int, default=4, help="Nesting depth of each card")
+    parser.add_argument("--scenarios", type=int, default=8, help="Scenarios in the batch benchmark")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batch concurrency")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--compare", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--verbose", action="store_true", help="Show the pipeline's own progress output")
+    args = parser.parse_args()
+    selected = args.benchmarks or list(BENCHMARKS)
+    unknown = set(selected) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    import config
+    from fake_llm import FakeChatModel
+    config.set_llm(FakeChatModel(latency_ms=args.llm_latency_ms))
+
+    results = {}
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with fixture_server() as base_url:
+        for name in selected:
+            if name in ("workflow", "batch"):
+                reason = _browser_available()
+                if reason:
+                    results[name] = {"skipped": reason}
+                    print(f"{name}: skipped ({reason})")
+                    continue
+            bench = globals()[f"bench_{name}"]
+            with quiet:
+                results[name] = bench(args, base_url) if name in ("workflow", "batch") else bench(args)
+            print(f"{name}: {json.dumps(results[name])}")
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
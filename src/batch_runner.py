@@ -0,0 +1,151 @@
+import argparse
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import time
+from typing import List, Optional
+
+import config
+from browser_backend import get_backend, run_with_backend
+from checkpoints import open_checkpointer
+from dom_store import dom_store_stats
+from rate_limiter import limiter_stats
+from script_builder import suite_module_name, write_test_module
+from workflow import run_workflow
+
+
+def load_manifest(path: str) -> List[dict]:
+    """
+    Read scenarios from a CSV or JSONL manifest.
+    Each scenario needs 'query' and 'target_url'; 'id' is optional and defaults to the row number.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    elif path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        raise ValueError(f"Unsupported manifest format: {path} (expected .csv or .jsonl)")
+
+    scenarios = []
+    for index, row in enumerate(rows):
+        if not row.get("query") or not row.get("target_url"):
+            raise ValueError(f"Manifest row {index} is missing 'query' or 'target_url'")
+        scenarios.append({
+            "id": str(row.get("id") or index),
+            "query": row["query"],
+            "target_url": row["target_url"],
+        })
+    return scenarios
+
+
+def scenario_run_id(scenario: dict) -> str:
+    """Stable run ID of a scenario, so a restarted batch resumes the checkpoints of its unfinished runs."""
+    content = f"{scenario['query']}\n{scenario['target_url']}"
+    return f"batch-{scenario['id']}-{hashlib.sha1(content.encode('utf-8')).hexdigest()[:12]}"
+
+
+def finished_scenarios(output_path: str) -> set:
+    """IDs of scenarios that already have an "ok" result in the output file of an earlier run."""
+    if not os.path.exists(output_path):
+        return set()
+    finished = set()
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # a line cut short by an interrupted run
+            if result.get("status") == "ok":
+                finished.add(str(result["id"]))
+    return finished
+
+
+async def run_scenario(scenario: dict, semaphore: asyncio.Semaphore, checkpointer=None, resume: bool = True) -> dict:
+    """
+    Run the workflow for one scenario once a concurrency slot is free.
+    With resume the run ID is derived from the scenario, otherwise every attempt starts over.
+    """
+    async with semaphore:
+        started = time.perf_counter()
+        result = {"id": scenario["id"], "query": scenario["query"], "target_url": scenario["target_url"]}
+        try:
+            state = await run_workflow(scenario["query"], scenario["target_url"],
+                                       scenario_run_id(scenario) if resume else None, checkpointer)
+            test_result = state.get("test_result") or {}
+            result.update({
+                # A test missing an abandoned action is not a usable result; a resumed batch runs it again
+                "status": "incomplete" if test_result.get("status") == "incomplete" else "ok",
+                "run_id": state.get("session_id"),
+                "test_name": state.get("test_name"),
+                "script": state.get("script"),
+                "test_result": test_result,
+                "trace_summary": state.get("trace_summary"),
+            })
+            if result["status"] == "incomplete":
+                result["error"] = test_result.get("message")
+        except Exception as e:
+            result.update({"status": "error", "error": f"{type(e).__name__}: {e}"})
+        result["duration_s"] = round(time.perf_counter() - started, 3)
+        return result
+
+
+async def run_batch(manifest_path: str, output_path: str, concurrency: int = config.BATCH_CONCURRENCY,
+                    resume: bool = True, suite_dir: Optional[str] = None) -> List[dict]:
+    """
+    Run every scenario of a manifest with at most `concurrency` in flight.
+    Results are appended to `output_path` (JSONL) as soon as each scenario finishes.
+    With resume, scenarios already "ok" in `output_path` are skipped and failed or interrupted
+    ones continue from their last checkpoint, so a crashed batch can simply be started again.
+    With `suite_dir`, each generated test is also written there as its own module next to a shared
+    conftest.py, giving a suite that can be run (and sharded) with plain pytest.
+    """
+    scenarios = load_manifest(manifest_path)
+    if resume:
+        finished = finished_scenarios(output_path)
+        scenarios = [scenario for scenario in scenarios if scenario["id"] not in finished]
+        if finished:
+            print(f"Skipping {len(finished)} scenarios already finished in {output_path}")
+    semaphore = asyncio.Semaphore(concurrency)
+    get_backend().reserve(concurrency)
+    print(f"Running {len(scenarios)} scenarios with concurrency {concurrency}")
+
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    async with open_checkpointer() as checkpointer:
+        tasks = [asyncio.create_task(run_scenario(scenario, semaphore, checkpointer, resume)) for scenario in scenarios]
+        with open(output_path, "a", encoding="utf-8") as out:
+            for finished in asyncio.as_completed(tasks):
+                result = await finished
+                if suite_dir and result["status"] == "ok" and result.get("script"):
+                    module_name = suite_module_name(result["test_name"], result["run_id"])
+                    result["module"] = write_test_module(suite_dir, module_name, result["script"])
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                results.append(result)
+                print(f"[{len(results)}/{len(scenarios)}] {result['id']}: {result['status']} ({result['duration_s']}s)")
+    stats = limiter_stats()
+    if stats:
+        print(f"LLM rate limiter: {stats}")
+    dom_stats = dom_store_stats()
+    if dom_stats:
+        print(f"DOM snapshot store: {dom_stats}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate Selenium tests for a manifest of scenarios.")
+    parser.add_argument("manifest", help="CSV or JSONL file with 'query' and 'target_url' columns")
+    parser.add_argument("--output", default="batch_results.jsonl", help="JSONL file for per-scenario results")
+    parser.add_argument("--concurrency", type=int, default=config.BATCH_CONCURRENCY)
+    parser.add_argument("--no-resume", action="store_true", help="Rerun finished scenarios and ignore checkpoints")
+    parser.add_argument("--suite-dir", help="Also write every generated test into this directory as a pytest suite")
+    args = parser.parse_args()
+
+    asyncio.run(run_with_backend(run_batch(args.manifest, args.output, args.concurrency,
+                                           resume=not args.no_resume, suite_dir=args.suite_dir)))
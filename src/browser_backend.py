@@ -0,0 +1,172 @@
+import asyncio
+from typing import Optional
+
+import config
+import tracing
+from dom_store import DomCapture, read_page_dom
+from models import TestGenState
+from script_builder import render_script
+import browser_session
+
+
+class SeleniumBackend:
+    """
+    Selenium WebDriver: one pooled Chrome per live session, driven from worker threads
+    because every WebDriver call blocks.
+    """
+
+    name = "selenium"
+    # Marker every valid action snippet contains, and the wording of the code generation prompts
+    command_marker = "driver."
+    code_kind = "Python Selenium"
+    script_kind = "Selenium"
+    runtime_hint = "Assume the variable 'driver' is available."
+    repair_hint = "Assume 'driver', By, Keys, EC and WebDriverWait are available."
+    # locator_check parses By.* locators, which only Selenium code has
+    locator_check = True
+
+    async def capture_dom(self, state: TestGenState) -> DomCapture:
+        if config.DOM_CAPTURE_MODE == "session" and state.get("session_id"):
+            return await asyncio.to_thread(self._capture_from_session, state)
+        exec_namespace = {}
+        exec(render_script(state["target_url"], state["action_blocks"], backend=self.name), exec_namespace)
+        # Run the script to get full DOM; the browser calls block, so keep them off the event loop
+        return await asyncio.to_thread(self._capture_by_replay, exec_namespace)
+
+    def _capture_by_replay(self, script_namespace: dict) -> DomCapture:
+        """get_page_dom() of the rendered script, reading the DOM through the pruning script."""
+        driver = script_namespace["open_browser_and_navigate"]()
+        try:
+            script_namespace["run_actions"](driver)
+            return read_page_dom(driver, with_source=self.needs_source)
+        finally:
+            script_namespace["close_browser"](driver)
+
+    def _capture_from_session(self, state: TestGenState) -> DomCapture:
+        """Read the DOM from the live session, opening or resynchronising it by full replay when needed."""
+        session = browser_session.get_session(state["session_id"])
+        if session is None:
+            session = browser_session.open_session(state["session_id"], state["target_url"])
+
+        if session.diverged or session.applied != state["current_action"]:
+            print(f"Replaying {state['current_action']} actions to resynchronise the browser session")
+            tracing.increment("session_replays")
+            exec_namespace = {}
+            exec(render_script(state["target_url"], state["action_blocks"], backend=self.name), exec_namespace)
+            try:
+                session.replay(exec_namespace["run_actions"], state["current_action"])
+            except Exception as e:
+                # The script itself fails on the page; capture what is there and keep the session marked diverged
+                print(f"Replay failed, capturing the current page instead: {e}")
+                session.diverged = True
+
+        return session.capture(with_source=self.needs_source)
+
+    @property
+    def needs_source(self) -> bool:
+        """Locators are verified against the unpruned source, not the pruned snapshot."""
+        return self.locator_check and config.LOCATOR_CHECK
+
+    async def apply_action(self, session_id: str, code: str) -> None:
+        """Advance the scenario's live session (if any, and in sync) by one validated action."""
+        session = browser_session.get_session(session_id)
+        if session is not None and not session.diverged:
+            await asyncio.to_thread(session.apply, code)
+
+    async def close_session(self, session_id: str) -> None:
+        browser_session.close_session(session_id)
+
+    def reserve(self, concurrency: int) -> None:
+        """Size the driver pool so every scenario in flight can hold a live session."""
+        from driver_pool import get_pool
+
+        get_pool().ensure_capacity(concurrency)
+
+    async def shutdown(self) -> None:
+        """Pooled drivers are quit by the pool's own atexit hook."""
+
+
+class PlaywrightBackend:
+    """
+    Async Playwright: one browser process per event loop and an isolated context per scenario,
+    awaited directly on the workflow's event loop instead of from worker threads.
+    """
+
+    name = "playwright"
+    command_marker = "page."
+    code_kind = "Python Playwright (async API)"
+    script_kind = "async Playwright"
+    runtime_hint = "Assume the variable 'page' (a Playwright Page) and 'expect' are available; await every call."
+    repair_hint = "Assume 'page' (a Playwright Page) and 'expect' are available; await every call."
+    locator_check = False
+
+    async def capture_dom(self, state: TestGenState) -> DomCapture:
+        import playwright_backend
+
+        exec_namespace = {}
+        exec(render_script(state["target_url"], state["action_blocks"], backend=self.name), exec_namespace)
+
+        if not (config.DOM_CAPTURE_MODE == "session" and state.get("session_id")):
+            # Replay mode: a throwaway context in the shared browser
+            session = await playwright_backend.PlaywrightSession(state["target_url"]).open()
+            try:
+                await exec_namespace["run_actions"](session.page)
+                return await session.capture()
+            finally:
+                await session.close()
+
+        session = playwright_backend.get_session(state["session_id"])
+        if session is None:
+            session = await playwright_backend.open_session(state["session_id"], state["target_url"])
+        if session.diverged or session.applied != state["current_action"]:
+            print(f"Replaying {state['current_action']} actions to resynchronise the browser session")
+            tracing.increment("session_replays")
+            try:
+                await session.replay(exec_namespace["run_actions"], state["current_action"])
+            except Exception as e:
+                print(f"Replay failed, capturing the current page instead: {e}")
+                session.diverged = True
+        return await session.capture()
+
+    async def apply_action(self, session_id: str, code: str) -> None:
+        import playwright_backend
+
+        session = playwright_backend.get_session(session_id)
+        if session is not None and not session.diverged:
+            await session.apply(code)
+
+    async def close_session(self, session_id: str) -> None:
+        import playwright_backend
+
+        await playwright_backend.close_session(session_id)
+
+    def reserve(self, concurrency: int) -> None:
+        """Contexts are not pooled; any number of scenarios share the one browser."""
+
+    async def shutdown(self) -> None:
+        """Close the shared browser; it belongs to the event loop that is about to finish."""
+        import playwright_backend
+
+        await playwright_backend.shutdown()
+
+
+_BACKENDS = {"selenium": SeleniumBackend, "playwright": PlaywrightBackend}
+_backend: Optional[object] = None
+
+
+def get_backend():
+    """The browser backend selected by BROWSER_BACKEND; Playwright is only imported when selected."""
+    global _backend
+    if _backend is None:
+        if config.BROWSER_BACKEND not in _BACKENDS:
+            raise ValueError(f"Unknown BROWSER_BACKEND {config.BROWSER_BACKEND!r}, expected one of {sorted(_BACKENDS)}")
+        _backend = _BACKENDS[config.BROWSER_BACKEND]()
+    return _backend
+
+
+async def run_with_backend(awaitable):
+    """Await a pipeline, then release the backend's per-loop resources before asyncio.run() closes the loop."""
+    try:
+        return await awaitable
+    finally:
+        await get_backend().shutdown()
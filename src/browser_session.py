@@ -0,0 +1,85 @@
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from dom_store import DomCapture, read_page_dom
+from driver_pool import get_pool
+
+
+class BrowserSession:
+    """
+    A browser that stays open for a whole scenario.
+    Validated action snippets are applied once, in order, so the DOM after action N
+    is captured without replaying actions 0..N-1 from a fresh page load.
+    """
+
+    def __init__(self, target_url: str):
+        self.target_url = target_url
+        self.driver = get_pool().checkout()
+        self.applied = 0
+        self.diverged = False
+        try:
+            self.driver.get(target_url)
+        except BaseException:
+            # No session will own the driver; hand it back instead of leaking the pool slot
+            get_pool().checkin(self.driver)
+            raise
+
+    def apply(self, action_code: str) -> bool:
+        """Run one action snippet against the live page. A failure marks the session as diverged."""
+        namespace = {"driver": self.driver, "By": By, "Keys": Keys, "EC": EC, "WebDriverWait": WebDriverWait, "time": time}
+        try:
+            exec(action_code, namespace)
+        except Exception as e:
+            print(f"Browser session diverged while applying action {self.applied}: {e}")
+            self.diverged = True
+            return False
+        self.applied += 1
+        return True
+
+    def replay(self, run_actions: Callable, applied: int) -> None:
+        """Resynchronise by reloading the target page and running the script's actions on this driver."""
+        self.driver.get(self.target_url)
+        run_actions(self.driver)
+        self.applied = applied
+        self.diverged = False
+
+    def page_source(self) -> str:
+        return self.driver.page_source
+
+    def capture(self, with_source: bool = False) -> DomCapture:
+        """The page's pruned DOM, plus its unpruned source when asked for."""
+        return read_page_dom(self.driver, with_source)
+
+    def close(self) -> None:
+        get_pool().checkin(self.driver)
+
+
+_sessions: Dict[str, BrowserSession] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(session_id: str) -> Optional[BrowserSession]:
+    with _sessions_lock:
+        return _sessions.get(session_id)
+
+
+def open_session(session_id: str, target_url: str) -> BrowserSession:
+    """Open a live session for a scenario, replacing any previous one with the same id."""
+    close_session(session_id)
+    session = BrowserSession(target_url)
+    with _sessions_lock:
+        _sessions[session_id] = session
+    return session
+
+
+def close_session(session_id: str) -> None:
+    with _sessions_lock:
+        session = _sessions.pop(session_id, None)
+    if session is not None:
+        session.close()
@@ -1,101 +1,48 @@
 from models import TestGenState
-import pytest
 import re
-import io
 import ast
-from contextlib import redirect_stderr, redirect_stdout
+import asyncio
+import hashlib
+from typing import List, Optional
 
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.prompts.chat import SystemMessagePromptTemplate, HumanMessagePromptTemplate
 import config
-
-
-llm = config.llm
+import tracing
+from browser_backend import get_backend
+from dom_parser import extract_relevant_dom_helper
+from dom_store import load_snapshot, load_source
+from locator_check import verify_locators
+from test_executor import run_generated_test
+from script_builder import (
+    derive_test_name,
+    make_action_block,
+    previous_actions_context,
+    render_script,
+    render_test_module,
+    test_function_name,
+)
 
 
 async def selenium_template(state: TestGenState) -> TestGenState:
-    """Initialize a Selenium script with the first action — navigate and capture DOM."""
-    selenium_code = f"""
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-
-def launch_browser():
-    options = Options()
-    options.add_argument("--headless=new")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    return driver
-
-def navigate_to(driver, url: str):
-    driver.get(url)
-
-def get_dom_state(driver):
-    return driver.page_source
-
-def close_browser(driver):
-    driver.quit()
-
-def get_page_dom():
-    driver = launch_browser()
-    try:
-        navigate_to(driver, "{state['target_url']}")
-        dom_state = get_dom_state(driver)
-        return dom_state
-    finally:
-        close_browser(driver)
-
-def open_browser_and_navigate():
-    driver = launch_browser()
-    navigate_to(driver, "{state['target_url']}")
-    return driver
-
-# Next Actions
-"""
-    state["script"] = selenium_code
-    return state
-
-
-async def build_initial_action(state: TestGenState) -> TestGenState:
-    """Initialize Selenium script with first navigation action."""
-    initial_script = f"""
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-
-def generated_script_run():
-    options = Options()
-    options.add_argument("--headless=new")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
-    # Action 0
-    driver.get("{state['target_url']}")
-
-    # Next Action
-
-    # Always return driver at the end
-    return driver
-"""
-    state["script"] = initial_script
-    state["current_action"] = int(state["current_action"]) + 1
+    """Initialize the structured browser script: no action blocks yet, navigation to the target URL."""
+    state["action_blocks"] = []
+    state["script"] = render_script(state["target_url"], [], backend=get_backend().name)
     return state
 
 
-async def generate_code_for_action(state: TestGenState) -> TestGenState:
-    """Generate Selenium code for the current action."""
+async def _generate_action_code(actions: list, index: int, minimal_dom: str, previous_actions: str) -> str:
+    """Ask the LLM for the code of actions[index], in the selected browser backend's API."""
     chat_template = ChatPromptTemplate.from_messages([
         SystemMessagePromptTemplate.from_template("""
-        You are an end-to-end testing specialist. Your goal is to write a Python Selenium code
+        You are an end-to-end testing specialist. Your goal is to write a {code_kind} code
         for an action specified by the user.
         """),
         HumanMessagePromptTemplate.from_template("""
         You will be provided with a minimal website <DOM>, the <Previous Actions> (not to include in output),
-        and the <Action> for which to write a Python Selenium code.
-        This <Action> code will be inserted into an existing Selenium script. Therefore, the code should be atomic.
-        Assume the variable 'driver' is available.
+        and the <Action> for which to write a {code_kind} code.
+        This <Action> code will be inserted into an existing {script_kind} script. Therefore, the code should be atomic.
+        {runtime_hint}
         Use data-testid for locating elements when possible, otherwise use a suitable selector.
         Always include any waits or assertions as appropriate.
         {last_action_assertion}
@@ -113,30 +60,144 @@ async def generate_code_for_action(state: TestGenState) -> TestGenState:
         """)
     ])
 
-    print(f"Generating action number: {state['current_action']}, {state['actions'][state['current_action']]}")
-
-    chain = chat_template | llm
-    current_action = state["actions"][state["current_action"]]
+    chain = chat_template | config.get_llm()
+    backend = get_backend()
     last_action_assertion = "Add an assertion to verify success for this final action." \
-        if state["current_action"] == len(state["actions"]) - 1 else ""
+        if index == len(actions) - 1 else ""
+
+    return (await chain.ainvoke({
+        "action": actions[index],
+        "minimal_dom": minimal_dom,
+        "previous_actions": previous_actions,
+        "last_action_assertion": last_action_assertion,
+        "code_kind": backend.code_kind,
+        "script_kind": backend.script_kind,
+        "runtime_hint": backend.runtime_hint,
+    })).content
+
+
+def _dom_fingerprint(minimal_dom: str) -> str:
+    return hashlib.sha1(minimal_dom.encode("utf-8")).hexdigest()
+
+
+async def _speculate_remaining_actions(state: TestGenState) -> List[Optional[dict]]:
+    """
+    Generate code for every remaining action concurrently against the current DOM snapshot.
+    Each result records a fingerprint of the minimal DOM it was generated from, its precondition.
+    """
+    actions = state["actions"]
+    first = state["current_action"]
+    # An evicted snapshot leaves only the current action's snippet to speculate from
+    full_dom = load_snapshot(state.get("website_state"))
+
+    async def speculate(index: int) -> dict:
+        minimal_dom = state["minimal_dom"] if index == first or full_dom is None \
+            else extract_relevant_dom_helper(full_dom, actions[index])
+        previous_actions = previous_actions_context(state["action_blocks"]) + "".join(
+            f"\n# Action {i} (planned): {actions[i]}" for i in range(first, index)
+        )
+        code = await _generate_action_code(actions, index, minimal_dom, previous_actions)
+        return {"code": code, "dom_fingerprint": _dom_fingerprint(minimal_dom)}
+
+    print(f"Speculatively generating actions {first}..{len(actions) - 1} in parallel")
+    results = await asyncio.gather(*(speculate(i) for i in range(first, len(actions))))
+    return [None] * first + list(results)
 
-    current_action_code = chain.invoke({
-        "action": current_action,
-        "minimal_dom": state["minimal_dom"],
-        "previous_actions": state["aggregated_raw_actions"],
-        "last_action_assertion": last_action_assertion
-    }).content
+
+async def generate_code_for_action(state: TestGenState) -> TestGenState:
+    """
+    Generate browser code for the current action.
+    With SPECULATIVE_CODEGEN, the first call generates all remaining actions at once; later calls reuse
+    the speculative code while the action's minimal DOM is unchanged and regenerate it otherwise.
+    """
+    index = state["current_action"]
+    print(f"Generating action number: {index}, {state['actions'][index]}")
+
+    previous_actions = previous_actions_context(state["action_blocks"])
+    regenerating = bool(state.get("error_message"))
+    if regenerating:
+        # Fallback after failed repairs: full prompt again, told why the last attempt was rejected
+        state["regenerations"] = state.get("regenerations", 0) + 1
+        state["repair_attempts"] = 0
+        previous_actions += f"\n# The last code for this action was rejected: {state['error_message']}"
+        tracing.increment("retries")
+
+    if config.SPECULATIVE_CODEGEN and not regenerating:
+        if not state.get("speculative_codes"):
+            state["speculative_codes"] = await _speculate_remaining_actions(state)
+        speculative = state["speculative_codes"][index]
+        if speculative and speculative["dom_fingerprint"] == _dom_fingerprint(state["minimal_dom"]):
+            state["current_action_code"] = speculative["code"]
+            print(f"Reusing speculative code for action {index}")
+            tracing.set_attrs(speculative_hit=True)
+            return state
+        print(f"DOM changed since speculation, regenerating action {index}")
+
+    current_action_code = await _generate_action_code(state["actions"], index, state["minimal_dom"], previous_actions)
 
     state["current_action_code"] = current_action_code
-    print("Generated Action Code:\n", current_action_code)
+    tracing.set_attrs(code_bytes=len(current_action_code))
+    return state
+
+
+async def repair_action_code(state: TestGenState) -> TestGenState:
+    """
+    Targeted repair of code rejected by the validator: only the failing snippet, the error
+    and the action's minimal DOM are sent back, not the full prompt with previous actions.
+    """
+    index = state["current_action"]
+    state["repair_attempts"] = state.get("repair_attempts", 0) + 1
+    print(f"Repairing action number {index} (attempt {state['repair_attempts']}): {state['error_message']}")
+    tracing.increment("retries")
+
+    chat_template = ChatPromptTemplate.from_messages([
+        SystemMessagePromptTemplate.from_template("""
+        You fix {code_kind} code snippets that failed validation.
+        """),
+        HumanMessagePromptTemplate.from_template("""
+        The <Code> below implements the <Action> but was rejected with the <Error>.
+        Return only the corrected Python code, without explanations or markdown.
+        {repair_hint}
+
+        <Action>:
+        {action}
+        <Error>:
+        {error}
+        <Code>:
+        {code}
+        ---
+        ### UNTRUSTED CONTENT DELIMITER ###
+        <DOM>:
+        {minimal_dom}
+        """)
+    ])
+    chain = chat_template | config.get_llm()
+    backend = get_backend()
+    state["current_action_code"] = (await chain.ainvoke({
+        "action": state["actions"][index],
+        "error": state["error_message"],
+        "code": state["current_action_code"],
+        "minimal_dom": state["minimal_dom"],
+        "code_kind": backend.code_kind,
+        "repair_hint": backend.repair_hint,
+    })).content
     return state
 
 
+_CODE_FENCE_RE = re.compile(r"^\s*```[\w-]*\s*\n(.*?)\n?\s*```\s*$", re.DOTALL)
+
+
+def _strip_code_fences(code: str) -> str:
+    """Models often wrap the snippet in a markdown fence; unwrap it before validating."""
+    match = _CODE_FENCE_RE.match(code)
+    return match.group(1) if match else code
+
+
 async def validate_generated_action(state: TestGenState) -> TestGenState:
     """Validate and insert generated action code into the script."""
-    current_action_code = state["current_action_code"]
+    current_action_code = _strip_code_fences(state["current_action_code"])
+    state["current_action_code"] = current_action_code
     current_action = state["current_action"]
-    script = state["script"]
 
     print(f"Validating action number {current_action}")
 
@@ -146,102 +207,87 @@ async def validate_generated_action(state: TestGenState) -> TestGenState:
         state["error_message"] = f"Invalid Python code: {e}"
         return state
 
-    if "driver." not in current_action_code:
-        state["error_message"] = "No Selenium driver command found in current_action_code."
+    backend = get_backend()
+    if backend.command_marker not in current_action_code:
+        state["error_message"] = f"No {backend.script_kind} command ({backend.command_marker}) found in current_action_code."
         return state
 
-    indentation = "    " * 1
-    indented_code = "\n".join([indentation + line for line in current_action_code.split("\n")])
-    indented_code += f'\n{indentation}driver.save_screenshot("screenshot_action_{current_action}.png")'
-
-    code_to_insert = f"# Action {current_action}\n{indented_code}\n{indentation}# Next Action"
-    updated_script = re.sub(r'# Next Action', code_to_insert, script, count=1)
-
-    state["script"] = updated_script
+    # Checked against the unpruned source: pruning drops iframes, SVG and hidden elements locators may target
+    source = load_source(state.get("source_snapshot")) if config.LOCATOR_CHECK and backend.locator_check else None
+    if source is None and state.get("source_snapshot") and config.LOCATOR_CHECK and backend.locator_check:
+        print(f"Skipping the locator check of action {current_action}: its page source was evicted")
+    if source:
+        # Reject locators that match nothing in the DOM the code was written for, before any browser runs it
+        with tracing.span("verify_locators", kind="parse"):
+            issues = verify_locators(current_action_code, source)
+        for issue in issues:
+            if issue.problem == "ambiguous":
+                print(f"Warning, ambiguous locator in action {current_action}: {issue.describe()}")
+        errors = [issue.describe() for issue in issues if issue.problem != "ambiguous"]
+        if errors:
+            state["error_message"] = "Locator check failed against the captured DOM: " + "; ".join(errors)
+            return state
+
+    state["action_blocks"] = state["action_blocks"] + [
+        make_action_block(current_action, current_action_code, state["actions"][current_action])
+    ]
     state["current_action"] = current_action + 1
-    state["aggregated_raw_actions"] += "\n" + current_action_code
+    state["error_message"] = None
+    state["repair_attempts"] = 0
+    state["regenerations"] = 0
 
-    print("Updated Script:\n", state["script"])
+    # Advance the live browser session so the next DOM capture needs no replay
+    if state.get("session_id"):
+        await backend.apply_action(state["session_id"], current_action_code)
     return state
 
 
 async def post_process_script(state: TestGenState) -> TestGenState:
-    """Finalize the Selenium code into a Pytest test case."""
-    final_script = re.sub(r'# Next Action.*', '', state["script"], flags=re.DOTALL)
-
-    global_helpers = """
-def take_global_screenshot(driver):
-    driver.save_screenshot("global_screenshot.png")
-
-def global_assertion_hook(driver):
-    # Example global verification
-    assert driver.title != "", "Page title is empty"
-"""
-
-    # Generate test name via LLM
-    chat_template = ChatPromptTemplate.from_messages([
-        HumanMessagePromptTemplate.from_template("""
-        You are generating a short Python test function name in snake_case.
-Constraints:
-- Maximum length: 10 characters (excluding the 'test_' prefix).
-- Use only lowercase letters, numbers, and underscores.
-- Keep it short, descriptive, and deterministic.
-- Do NOT include extra words like "verify", "should", or "results_appear".
-- Output ONLY the name (no explanations, no code, no prefix).
-
-Context:
-User query: {query}
-Actions summary: {actions}
-
-Return ONLY the short name (e.g., "login_ok", "cart_add", "nav_home").
-""")
-    ])
-
-    chain = chat_template | llm
-    test_name = chain.invoke({
-        "query": state["query"],
-        "actions": state["aggregated_raw_actions"]
-    }).content
-    test_name = f'test_{re.sub(r"[^\w]", "_", test_name.strip())}'
-
-    test_script = f"""
-import pytest
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-
-{final_script}
-
-{global_helpers}
-
-@pytest.mark.parametrize("driver", [open_browser_and_navigate()], indirect=False)
-def {test_name}(driver):
-    # Next Action
-
-    # Global verification
-    take_global_screenshot(driver)
-    global_assertion_hook(driver)
-    driver.quit()
-"""
+    """
+    Finalize the action code into a Pytest test case.
+    When validation gave up on an action, the module only holds the actions before it; the
+    abandoned action is recorded so the run is reported as incomplete instead of being executed.
+    """
+    if state.get("session_id"):
+        await get_backend().close_session(state["session_id"])
+
+    if state.get("error_message") and state["current_action"] < len(state["actions"]):
+        state["abandoned_action"] = {
+            "index": state["current_action"],
+            "action": state["actions"][state["current_action"]],
+            "error": state["error_message"],
+        }
+
+    # The name comes with the action list (one fused call); without it, it is derived locally
+    test_name = test_function_name(state.get("test_name") or derive_test_name(state["query"], state["actions"]))
+
+    # The script is rendered once, from the ordered action blocks
+    test_script = render_test_module(state["target_url"], state["action_blocks"], test_name, state.get("session_id"),
+                                     backend=get_backend().name)
     state["script"] = test_script
     state["test_name"] = test_name
     print("Generated Test Name:", test_name)
-    print("Final Selenium Test Script:\n", test_script)
+    tracing.set_attrs(script_bytes=len(test_script), actions=len(state["action_blocks"]))
     return state
 
 
-def execute_test_case(state: TestGenState) -> TestGenState:
-    """Execute the generated Selenium test."""
-    print("Evaluating the generated test with PyTest.")
-    test_file = "generated_test.py"
-    with open(test_file, "w") as f:
-        f.write(state["script"])
-
-    output = io.StringIO()
-    with redirect_stdout(output), redirect_stderr(output):
-        pytest.main(["-v", test_file])
-    state["test_evaluation_output"] = output.getvalue()
-    print("Test Evaluation Output:\n", state["test_evaluation_output"])
+async def execute_test_case(state: TestGenState) -> TestGenState:
+    """Execute the generated test in an isolated pytest process; an incomplete test is not run."""
+    abandoned = state.get("abandoned_action")
+    if abandoned:
+        result = {
+            "test_name": state["test_name"], "status": "incomplete", "tests": 0, "failures": 0, "errors": 0,
+            "duration_s": 0.0, "failing_step": abandoned["index"],
+            "message": f"Action {abandoned['index']} ({abandoned['action']}) was abandoned: {abandoned['error']}",
+            "artifacts": [], "workdir": None, "output": "",
+        }
+        print(f"Not running the incomplete test: {result['message']}")
+    else:
+        print("Evaluating the generated test with PyTest.")
+        result = await run_generated_test(state["test_name"], state["script"], run_id=state.get("session_id"))
+    tracing.set_attrs(test_status=result["status"], test_duration_s=result["duration_s"])
+    state["test_result"] = {k: v for k, v in result.items() if k != "output"}
+    state["test_evaluation_output"] = result["output"]
+    print(f"Test {result['status']} in {result['duration_s']}s"
+          + (f", failing at action {result['failing_step']}" if result["failing_step"] is not None else ""))
     return state
@@ -0,0 +1,34 @@
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import config
+
+
+@asynccontextmanager
+async def open_checkpointer(path: Optional[str] = None):
+    """
+    Async SQLite checkpointer for the workflow graphs (None when CHECKPOINT_PATH is empty).
+    One checkpointer can be shared by every run of a batch; runs are told apart by thread_id.
+    """
+    path = config.CHECKPOINT_PATH if path is None else path
+    if not path:
+        yield None
+        return
+    from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(path) as checkpointer:
+        yield checkpointer
+
+
+async def pending_nodes(app, run_config: dict) -> tuple:
+    """Nodes a checkpointed run still has to execute; empty for an unknown or finished run."""
+    snapshot = await app.aget_state(run_config)
+    return tuple(snapshot.next) if snapshot and snapshot.values else ()
+
+
+async def discard_run(checkpointer, run_id: str) -> None:
+    """Drop the checkpoints of a finished run; they hold full DOM snapshots and are no longer needed."""
+    if checkpointer is not None:
+        await checkpointer.adelete_thread(run_id)
@@ -0,0 +1,94 @@
+"""
+Command line entry point for both pipelines.
+
+    python cli.py e2e --query "Search for 'Rachel' and verify results" --url https://www.google.com/
+    python cli.py batch scenarios.jsonl --output results.jsonl --concurrency 8
+    python cli.py plan ../data/requirements.txt --output test_cases.csv
+
+Pipeline modules (LangChain, LangGraph, Selenium) are imported inside the command
+handlers, so `--help` and argument errors return without loading them.
+"""
+import argparse
+import sys
+
+
+def e2e_command(args) -> int:
+    import asyncio
+    import os
+    from browser_backend import run_with_backend
+    from script_builder import write_test_module
+    from workflow import run_workflow
+
+    result = asyncio.run(run_with_backend(run_workflow(args.query, args.url, args.run_id)))
+    status = (result.get("test_result") or {}).get("status")
+    if status == "incomplete":
+        print(result["test_result"]["message"])
+    elif args.output:
+        # The module gets the suite's shared conftest.py (driver fixture) next to it
+        write_test_module(os.path.dirname(os.path.abspath(args.output)), os.path.basename(args.output), result["script"])
+        print(f"Wrote {result['test_name']} to {args.output}")
+    print(f"Test {result['test_name']}: {status}")
+    return 0 if status == "passed" else 1
+
+
+def batch_command(args) -> int:
+    import asyncio
+    from batch_runner import run_batch
+    from browser_backend import run_with_backend
+
+    results = asyncio.run(run_with_backend(run_batch(args.manifest, args.output, args.concurrency,
+                                                     resume=not args.no_resume, suite_dir=args.suite_dir)))
+    return 0 if all(r["status"] == "ok" for r in results) else 1
+
+
+def plan_command(args) -> int:
+    import asyncio
+    from generate_test_plan import DEFAULT_REQUIREMENT_PATH, run_test_plan
+
+    state = {
+        "requirement_path": args.requirement or DEFAULT_REQUIREMENT_PATH,
+        "export_path": args.output,
+        "regenerate_all": args.full,
+    }
+    result = asyncio.run(run_test_plan(state))
+    print(f"Exported {result['test_case_count']} test cases to {result['exported_file']}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="cli.py", description="AI test generator: E2E Selenium scripts and QA test plans.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    e2e = commands.add_parser("e2e", help="Generate and run a Selenium test for one scenario")
+    e2e.add_argument("--query", required=True, help="Plain English test scenario")
+    e2e.add_argument("--url", required=True, help="URL of the website to test")
+    e2e.add_argument("--output", help="Write the generated test module to this file (with a conftest.py next to it)")
+    e2e.add_argument("--run-id", help="Resume the checkpointed run with this ID (printed when a run starts)")
+    e2e.set_defaults(handler=e2e_command)
+
+    batch = commands.add_parser("batch", help="Generate tests for a CSV/JSONL manifest of scenarios")
+    batch.add_argument("manifest", help="CSV or JSONL file with 'query' and 'target_url' columns")
+    batch.add_argument("--output", default="batch_results.jsonl", help="JSONL file for per-scenario results")
+    batch.add_argument("--concurrency", type=int, default=None, help="Scenarios in flight (default: BATCH_CONCURRENCY)")
+    batch.add_argument("--no-resume", action="store_true", help="Rerun finished scenarios and ignore checkpoints")
+    batch.add_argument("--suite-dir", help="Also write every generated test into this directory as a pytest suite")
+    batch.set_defaults(handler=batch_command)
+
+    plan = commands.add_parser("plan", help="Generate a QA test plan from a requirement document")
+    plan.add_argument("requirement", nargs="?", help="Requirement file (default: data/requirements.txt)")
+    plan.add_argument("--output", default="test_cases.csv", help="Plan file: .csv, .jsonl or .parquet")
+    plan.add_argument("--full", action="store_true", help="Ignore the section manifest and regenerate every section")
+    plan.set_defaults(handler=plan_command)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if getattr(args, "concurrency", 0) is None:
+        import config
+        args.concurrency = config.BATCH_CONCURRENCY
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
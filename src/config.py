@@ -1,19 +1,170 @@
 import os
+import tempfile
 from dotenv import load_dotenv
-from langchain_groq import ChatGroq
 
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-if not GROQ_API_KEY:
-    raise ValueError("Missing GROQ_API_KEY in .env")
-
-llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    api_key=GROQ_API_KEY
-)
\ No newline at end of file
+# LLM response cache: "off", "readwrite" (record and reuse) or "replay" (offline, fail on miss)
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite")
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".llm_cache", "responses.sqlite")
+)
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Chat model: "groq", or "fake" for the deterministic offline model (canned responses, FAKE_LLM_LATENCY_MS per call)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", 0))
+
+# Shared rate limiter for Groq calls: requests and tokens per minute (defaults: free tier of
+# llama-3.1-8b-instant), adaptive concurrency up to LLM_MAX_CONCURRENCY, shrinking while responses
+# are slower than LLM_LATENCY_TARGET_S. Each request times out after LLM_TIMEOUT_S; queueing plus
+# retries of one call must finish within LLM_DEADLINE_S.
+LLM_RPM = int(os.getenv("LLM_RPM", 30))
+LLM_TPM = int(os.getenv("LLM_TPM", 6000))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 8))
+LLM_LATENCY_TARGET_S = float(os.getenv("LLM_LATENCY_TARGET_S", 10))
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", 60))
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE_S", 300))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 3))
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.getenv("LLM_COMPLETION_TOKENS_ESTIMATE", 300))
+
+# Number of scenarios the batch runner keeps in flight at once
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
+
+# Browser backend for DOM capture and generated tests: "selenium" or "playwright" (async, one
+# browser process with an isolated context per scenario)
+BROWSER_BACKEND = os.getenv("BROWSER_BACKEND", "selenium").lower()
+PLAYWRIGHT_BROWSER = os.getenv("PLAYWRIGHT_BROWSER", "chromium")
+
+# Warm Selenium driver pool shared by DOM capture and generated tests; a batch grows it to its --concurrency
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+DRIVER_POOL_SIZE = int(os.getenv("DRIVER_POOL_SIZE", BATCH_CONCURRENCY))
+DRIVER_MAX_AGE_S = float(os.getenv("DRIVER_MAX_AGE_S", 600))
+DRIVER_MAX_USES = int(os.getenv("DRIVER_MAX_USES", 50))
+# Longest wait for a free driver before a checkout fails (0 waits forever)
+DRIVER_CHECKOUT_TIMEOUT_S = float(os.getenv("DRIVER_CHECKOUT_TIMEOUT_S", 300))
+
+# DOM capture: "session" keeps one live browser per scenario, "replay" re-runs the script per action
+DOM_CAPTURE_MODE = os.getenv("DOM_CAPTURE_MODE", "session")
+
+# DOM snapshots are pruned in the browser (scripts, styles, SVG, hidden subtrees) and kept compressed
+# and deduplicated in an in-memory store bounded to DOM_STORE_MAX_BYTES; the state holds only their ID
+DOM_PRUNE = os.getenv("DOM_PRUNE", "true").lower() in ("1", "true", "yes")
+DOM_STORE_MAX_BYTES = int(os.getenv("DOM_STORE_MAX_BYTES", 64 * 1024 * 1024))
+# Unpruned page sources (for the locator check) are much larger and live in a separate store with its
+# own budget, so they never evict pruned snapshots; an evicted source skips the check for that action
+DOM_SOURCE_STORE_MAX_BYTES = int(os.getenv("DOM_SOURCE_STORE_MAX_BYTES", 16 * 1024 * 1024))
+
+# Upper bound on the (estimated) tokens of the minimal DOM sent with each action prompt
+DOM_TOKEN_BUDGET = int(os.getenv("DOM_TOKEN_BUDGET", 1500))
+
+# Previous actions sent verbatim to the code generator; the PREVIOUS_ACTIONS_SUMMARIES before them are
+# reduced to one-line summaries and anything older to a single "# Actions 0-K done" line
+PREVIOUS_ACTIONS_WINDOW = int(os.getenv("PREVIOUS_ACTIONS_WINDOW", 3))
+PREVIOUS_ACTIONS_SUMMARIES = int(os.getenv("PREVIOUS_ACTIONS_SUMMARIES", 5))
+
+# Generate code for all actions concurrently up front; only actions whose DOM changed are regenerated
+SPECULATIVE_CODEGEN = os.getenv("SPECULATIVE_CODEGEN", "false").lower() in ("1", "true", "yes")
+
+# Invalid action code is first sent back for a targeted repair (snippet + error + DOM fragment),
+# then regenerated with the full prompt; past both limits the script is finalised without it
+MAX_REPAIR_ATTEMPTS = int(os.getenv("MAX_REPAIR_ATTEMPTS", 2))
+MAX_REGENERATIONS = int(os.getenv("MAX_REGENERATIONS", 1))
+
+# Check each action's locators against the captured DOM before accepting it; missing ones go to repair
+LOCATOR_CHECK = os.getenv("LOCATOR_CHECK", "true").lower() in ("1", "true", "yes")
+
+# Generated tests run in separate pytest processes, each in its own directory under TEST_RUN_DIR.
+# Directories of passing tests are deleted; only the newest TEST_KEEP_RUNS others are kept.
+TEST_WORKERS = int(os.getenv("TEST_WORKERS", os.cpu_count() or 1))
+TEST_TIMEOUT_S = float(os.getenv("TEST_TIMEOUT_S", 300))
+TEST_RUN_DIR = os.getenv("TEST_RUN_DIR") or os.path.join(tempfile.gettempdir(), "ai-test-generator-runs")
+TEST_KEEP_RUNS = int(os.getenv("TEST_KEEP_RUNS", 50))
+
+# Test-plan generation: requirement sections are planned concurrently, each at most this long
+PLAN_CONCURRENCY = int(os.getenv("PLAN_CONCURRENCY", 4))
+PLAN_SECTION_MAX_CHARS = int(os.getenv("PLAN_SECTION_MAX_CHARS", 6000))
+
+# Screenshots in generated tests: "always" (after every action), "on_failure" or "every_n" (every Nth action).
+# A failing test is captured under every policy. They are written by a background thread to
+# ARTIFACT_DIR/<run_id>/, optionally downscaled (max width in px, 0 keeps the size) and re-encoded
+# (png, jpeg or webp; needs Pillow); only the newest ARTIFACT_KEEP_RUNS run directories are kept.
+SCREENSHOT_POLICY = os.getenv("SCREENSHOT_POLICY", "on_failure")
+SCREENSHOT_EVERY_N = int(os.getenv("SCREENSHOT_EVERY_N", 5))
+SCREENSHOT_MAX_WIDTH = int(os.getenv("SCREENSHOT_MAX_WIDTH", 0))
+SCREENSHOT_FORMAT = os.getenv("SCREENSHOT_FORMAT", "png")
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", 80))
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "artifacts"))
+ARTIFACT_KEEP_RUNS = int(os.getenv("ARTIFACT_KEEP_RUNS", 200))
+
+# Per-run JSONL traces and summaries are written here; set to an empty string to disable
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "traces"))
+
+# Each node's output state is checkpointed here (SQLite, keyed by run ID) so failed runs resume; "" disables
+CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".checkpoints", "runs.sqlite")
+)
+
+# LangGraph step limit; the per-action loop takes three steps per action, plus two per repair or regeneration
+WORKFLOW_RECURSION_LIMIT = int(os.getenv("WORKFLOW_RECURSION_LIMIT", 200))
+
+_llm = None
+_llm_cache = None
+
+
+def get_llm_cache():
+    """The shared LLM response cache (None when LLM_CACHE_MODE=off), created on first use."""
+    global _llm_cache
+    if _llm_cache is None and LLM_CACHE_MODE != "off":
+        from llm_cache import build_llm_cache
+        _llm_cache = build_llm_cache(LLM_CACHE_MODE, LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES)
+    return _llm_cache
+
+
+def get_llm():
+    """
+    The chat model shared by every node, built on first use so that importing config
+    (for --help, dry runs, ...) neither loads the Groq client nor requires an API key.
+    """
+    global _llm
+    if _llm is None and LLM_PROVIDER == "fake":
+        from fake_llm import FakeChatModel
+        _llm = FakeChatModel(latency_ms=FAKE_LLM_LATENCY_MS)
+    if _llm is None:
+        api_key = GROQ_API_KEY
+        if not api_key:
+            if LLM_CACHE_MODE != "replay":
+                raise ValueError("Missing GROQ_API_KEY in .env")
+            # Replay mode never reaches the provider, so a placeholder key is enough.
+            api_key = "replay-only"
+
+        from groq_client import RateLimitedChatGroq
+        _llm = RateLimitedChatGroq(
+            model="llama-3.1-8b-instant",
+            temperature=0,
+            max_tokens=None,
+            timeout=LLM_TIMEOUT_S,
+            max_retries=0,  # retried by RateLimitedChatGroq through the shared limiter
+            api_key=api_key,
+            cache=get_llm_cache()
+        )
+    return _llm
+
+
+def set_llm(llm) -> None:
+    """Use another chat model (e.g. a fake one for offline runs) everywhere config.llm is used."""
+    global _llm
+    _llm = llm
+
+
+def __getattr__(name):
+    # Keep `config.llm` / `config.llm_cache` working while constructing them lazily
+    if name == "llm":
+        return get_llm()
+    if name == "llm_cache":
+        return get_llm_cache()
+    raise AttributeError(f"module 'config' has no attribute '{name}'")
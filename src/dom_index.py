@@ -0,0 +1,157 @@
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from typing import List
+
+from bs4 import BeautifulSoup
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+
+INTERACTIVE_TAGS = {"a", "button", "input", "select", "textarea", "option", "summary"}
+TEXT_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6", "p", "li", "td", "th", "span", "div", "label", "legend", "caption"}
+SKIPPED_TAGS = ["script", "style", "noscript", "svg", "template", "iframe", "head"]
+KEPT_ATTRIBUTES = ("id", "name", "type", "role", "data-testid", "aria-label", "placeholder",
+                   "value", "title", "alt", "href", "for")
+VOID_TAGS = {"input", "img", "br", "hr", "meta", "link"}
+MAX_TEXT_CHARS = 80
+MAX_ATTR_CHARS = 60
+
+STOP_WORDS = {"the", "a", "an", "to", "of", "in", "on", "and", "or", "for", "with", "that", "this",
+              "is", "are", "be", "it", "as", "at", "by", "via", "into", "from", "field", "page"}
+CLICK_WORDS = {"click", "press", "select", "open", "submit", "tap", "choose", "check"}
+TYPE_WORDS = {"type", "enter", "input", "fill", "write", "search"}
+VERIFY_WORDS = {"verify", "assert", "expect", "check", "confirm", "ensure", "appear", "appears", "contain", "contains"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in STOP_WORDS]
+
+
+def _is_hidden(el) -> bool:
+    style = (el.get("style") or "").replace(" ", "").lower()
+    return (el.has_attr("hidden") or el.get("aria-hidden") == "true"
+            or "display:none" in style or "visibility:hidden" in style)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)."""
+    return len(text) // 4 + 1
+
+
+class DomIndex:
+    """
+    One parse of a page snapshot, kept as compact parallel arrays of candidate elements:
+    tags, rendered snippets (stripped attributes), searchable tokens and whether the element is interactive.
+    """
+
+    def __init__(self, html: str):
+        soup = BeautifulSoup(html, HTML_PARSER)
+        for el in soup.find_all(SKIPPED_TAGS):
+            el.decompose()
+        for el in soup.find_all(_is_hidden):
+            if not el.decomposed:
+                el.decompose()
+
+        labels = {}
+        for label in soup.find_all("label"):
+            if label.get("for"):
+                labels[label["for"]] = label.get_text(" ", strip=True)[:MAX_TEXT_CHARS]
+
+        self.tags: List[str] = []
+        self.snippets: List[str] = []
+        self.tokens: List[frozenset] = []
+        self.interactive: List[bool] = []
+
+        for el in soup.find_all(True):
+            if el.get("type") == "hidden":
+                continue
+            attrs = {k: el.get(k) for k in KEPT_ATTRIBUTES if el.get(k)}
+            is_interactive = (el.name in INTERACTIVE_TAGS or "role" in attrs or "data-testid" in attrs
+                              or el.has_attr("onclick") or el.has_attr("contenteditable"))
+            if is_interactive:
+                text = el.get_text(" ", strip=True)[:MAX_TEXT_CHARS]
+            elif el.name in TEXT_TAGS:
+                text = " ".join(s.strip() for s in el.find_all(string=True, recursive=False) if s.strip())
+                text = text[:MAX_TEXT_CHARS]
+                if not text:
+                    continue
+            else:
+                continue
+
+            label = labels.get(attrs.get("id", ""), "")
+            self.tags.append(el.name)
+            self.snippets.append(self._render(el.name, attrs, text, label))
+            self.tokens.append(frozenset(tokenize(" ".join([text, label, *map(str, attrs.values())]))))
+            self.interactive.append(is_interactive)
+
+        document_frequency = {}
+        for element_tokens in self.tokens:
+            for token in element_tokens:
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+        total = len(self.tokens) or 1
+        self.idf = {t: math.log(1 + total / df) for t, df in document_frequency.items()}
+
+    @staticmethod
+    def _render(tag: str, attrs: dict, text: str, label: str) -> str:
+        rendered_attrs = "".join(f' {k}="{str(v)[:MAX_ATTR_CHARS]}"' for k, v in attrs.items())
+        if label:
+            rendered_attrs += f' label="{label}"'
+        if tag in VOID_TAGS:
+            return f"<{tag}{rendered_attrs}>"
+        return f"<{tag}{rendered_attrs}>{text}</{tag}>"
+
+    def _intent_bonus(self, i: int, action_words: set) -> float:
+        tag = self.tags[i]
+        if action_words & TYPE_WORDS and tag in ("input", "textarea", "select"):
+            return 1.0
+        if action_words & CLICK_WORDS and tag in ("button", "a", "input", "summary", "option"):
+            return 1.0
+        if action_words & VERIFY_WORDS and not self.interactive[i]:
+            return 0.5
+        return 0.1 if self.interactive[i] else 0.0
+
+    def relevant_snippet(self, action: str, token_budget: int, max_nodes: int = 50) -> str:
+        """Snippets ranked by lexical similarity to the action, most relevant first, within token_budget."""
+        action_tokens = set(tokenize(action))
+        action_words = set(_TOKEN_RE.findall(action.lower()))
+        scored = []
+        for i, element_tokens in enumerate(self.tokens):
+            score = sum(self.idf[t] for t in action_tokens & element_tokens) + self._intent_bonus(i, action_words)
+            if score > 0:
+                scored.append((-score, i))
+        scored.sort()
+
+        selected, used = [], 0
+        for _, i in scored[:max_nodes]:
+            cost = estimate_tokens(self.snippets[i])
+            if used + cost > token_budget:
+                continue
+            selected.append(self.snippets[i])
+            used += cost
+        return "\n".join(selected)
+
+
+_index_cache: "OrderedDict[str, DomIndex]" = OrderedDict()
+INDEX_CACHE_SIZE = 32
+
+
+def get_dom_index(html: str) -> DomIndex:
+    """Return the index for a snapshot, parsing it only the first time the same DOM is seen."""
+    key = hashlib.sha1(html.encode("utf-8", "ignore")).hexdigest()
+    index = _index_cache.get(key)
+    if index is None:
+        index = DomIndex(html)
+        _index_cache[key] = index
+        if len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    else:
+        _index_cache.move_to_end(key)
+    return index
@@ -1,52 +1,46 @@
-
-
 from models import TestGenState
-from bs4 import BeautifulSoup
+import config
+import tracing
+from dom_index import get_dom_index
+from dom_store import store_snapshot, store_source
+from browser_backend import get_backend
 
 
 
-def extract_relevant_dom_helper(full_dom: str, action: str, max_nodes: int = 50) -> str:
+def extract_relevant_dom_helper(full_dom: str, action: str, max_nodes: int = 50,
+                                token_budget: int = config.DOM_TOKEN_BUDGET) -> str:
     """
     Extract a minimal DOM snippet relevant to the current action.
-    Generic rules:
-        - If action involves clicking, take buttons and links.
-        - If action involves typing/filling, take input fields.
-        - If action involves asserting/verifying, take visible text elements.
-        - Otherwise, take top interactive elements.
+    The page is parsed once per snapshot into a DomIndex; elements are ranked by lexical
+    similarity to the action (with a bonus for the kind of element the action verb targets:
+    inputs for typing, buttons and links for clicking, text for assertions) and rendered
+    with stripped attributes until the token budget is used up.
     """
-    soup = BeautifulSoup(full_dom, "html.parser")
-    elements = []
-
-    action_lower = action.lower()
-    if "click" in action_lower:
-        elements = soup.find_all(["button", "a"], limit=max_nodes)
-    elif "input" in action_lower or "type" in action_lower or "enter" in action_lower:
-        elements = soup.find_all("input", limit=max_nodes)
-    elif "assert" in action_lower or "verify" in action_lower or "expect" in action_lower:
-        elements = soup.find_all(text=True, limit=max_nodes)
-    else:
-        elements = soup.find_all(["input", "button", "a"], limit=max_nodes)
-
-    minimal_dom = "".join(str(el) for el in elements)
-    return minimal_dom
+    return get_dom_index(full_dom).relevant_snippet(action, token_budget, max_nodes)
 
 async def get_website_dom(state: TestGenState) -> TestGenState:
     """
     Get the full DOM and extract the minimal DOM relevant for the current action.
-    - website_state: full DOM
+    - website_state: ID of the (pruned) DOM snapshot in the snapshot store; the HTML is not kept in the state
+    - source_snapshot: ID of the unpruned page source, when the backend verifies locators against it
     - minimal_dom: relevant snippet for the current action
+    In "session" capture mode the DOM is read from the scenario's live browser, which already
+    ran every validated action; the script is replayed only when that session is missing or diverged.
     """
     print(f"Obtaining DOM for action number {state['current_action']}")
 
-    exec_namespace = {}
-    exec(state["script"], exec_namespace)
-
-    # Run the script to get full DOM
-    full_dom = await exec_namespace["get_page_dom"]()
-    state["website_state"] = full_dom
+    backend = get_backend()
+    with tracing.span("capture_dom", kind="browser", mode=config.DOM_CAPTURE_MODE, backend=backend.name):
+        capture = await backend.capture_dom(state)
+    full_dom = capture.dom
+    state["website_state"] = store_snapshot(full_dom)
+    state["source_snapshot"] = store_source(capture.source) if capture.source is not None else None
 
     # Extract minimal DOM for the current action
     current_action = state["actions"][state["current_action"]]
-    state["minimal_dom"] = extract_relevant_dom_helper(full_dom, current_action)
+    with tracing.span("minimize_dom", kind="parse"):
+        state["minimal_dom"] = extract_relevant_dom_helper(full_dom, current_action)
+    tracing.set_attrs(dom_bytes=len(full_dom), minimal_dom_bytes=len(state["minimal_dom"]),
+                      dom_snapshot=state["website_state"])
 
-    return state
\ No newline at end of file
+    return state
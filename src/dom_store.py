@@ -0,0 +1,187 @@
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import config
+
+
+MAX_TEXT_CHARS = 200
+MAX_ATTR_CHARS = 200
+
+# Runs in the page (Selenium execute_script body, Playwright evaluate function body) and returns
+# the interactive skeleton of the DOM: a copy of the document without scripts, styles, SVG,
+# embedded media and hidden subtrees, with inline styles and event handlers dropped and long
+# text and attribute values cut. The live page is never modified.
+PRUNE_DOM_JS = """
+const DROPPED = 'script, style, noscript, svg, template, link, meta, iframe, object, embed, canvas, video, audio';
+const root = document.documentElement;
+const live = root.querySelectorAll('*');
+const copy = root.cloneNode(true);
+const copied = copy.querySelectorAll('*');
+const body = document.body;
+for (let i = 0; i < live.length; i++) {
+  const el = live[i], out = copied[i];
+  if (!copy.contains(out)) continue;  // inside a subtree that is already dropped
+  if (el.matches(DROPPED) || (el.tagName === 'INPUT' && el.type === 'hidden')) { out.remove(); continue; }
+  if (body && body.contains(el)) {
+    const style = getComputedStyle(el);
+    if (el.hidden || style.display === 'none' || style.visibility === 'hidden') { out.remove(); continue; }
+  }
+  for (const attr of Array.from(out.attributes)) {
+    if (attr.name === 'style' || (attr.name.startsWith('on') && attr.name !== 'onclick')) {
+      out.removeAttribute(attr.name);
+    } else if (attr.value.length > %(max_attr)d) {
+      out.setAttribute(attr.name, attr.value.slice(0, %(max_attr)d));
+    }
+  }
+  if (out.hasAttribute('onclick')) out.setAttribute('onclick', '');
+}
+const walker = document.createTreeWalker(copy, NodeFilter.SHOW_TEXT | NodeFilter.SHOW_COMMENT);
+const comments = [];
+for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+  if (node.nodeType === Node.COMMENT_NODE) { comments.push(node); continue; }
+  const text = node.nodeValue.replace(/\\s+/g, ' ');
+  node.nodeValue = text.length > %(max_text)d ? text.slice(0, %(max_text)d) : text;
+}
+comments.forEach(node => node.remove());
+return copy.outerHTML;
+""" % {"max_attr": MAX_ATTR_CHARS, "max_text": MAX_TEXT_CHARS}
+
+
+class DomCapture(NamedTuple):
+    dom: str  # pruned skeleton (the full source when DOM_PRUNE is off or pruning failed)
+    source: Optional[str]  # unpruned page source, when requested for locator verification
+
+
+def read_page_dom(driver, with_source: bool = False) -> DomCapture:
+    """
+    The pruned DOM of a Selenium driver's page (DOM_PRUNE), or its full page source.
+    with_source also returns the unpruned source: locators may legitimately target elements that
+    pruning drops (iframes, SVG icons, hidden menus revealed by a hover).
+    """
+    source = driver.page_source if with_source or not config.DOM_PRUNE else None
+    if config.DOM_PRUNE:
+        try:
+            dom = driver.execute_script(PRUNE_DOM_JS)
+            if isinstance(dom, str):
+                return DomCapture(dom, source)
+        except Exception as e:
+            print(f"DOM pruning failed, capturing the full page source instead: {e}")
+    source = source if source is not None else driver.page_source
+    return DomCapture(source, source if with_source else None)
+
+
+async def read_page_dom_async(page, with_source: bool = False) -> DomCapture:
+    """read_page_dom() for an async Playwright page."""
+    source = await page.content() if with_source or not config.DOM_PRUNE else None
+    if config.DOM_PRUNE:
+        try:
+            dom = await page.evaluate("() => {" + PRUNE_DOM_JS + "}")
+            if isinstance(dom, str):
+                return DomCapture(dom, source)
+        except Exception as e:
+            print(f"DOM pruning failed, capturing the full page content instead: {e}")
+    source = source if source is not None else await page.content()
+    return DomCapture(source, source if with_source else None)
+
+
+class DomSnapshotStore:
+    """
+    DOM snapshots kept zlib-compressed and deduplicated by content hash, so the workflow state only
+    carries a short snapshot ID. Least recently used snapshots are evicted once the compressed total
+    exceeds max_bytes; callers treat a missing snapshot (evicted, or a run resumed in another
+    process) as no snapshot.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._snapshots: "OrderedDict[str, bytes]" = OrderedDict()
+        self._stored_bytes = 0
+        self._lock = threading.Lock()
+        self.counters = {"puts": 0, "duplicates": 0, "evictions": 0, "raw_bytes": 0}
+
+    def put(self, html: str) -> str:
+        """Store a snapshot and return its ID; storing the same DOM again returns the same ID."""
+        raw = html.encode("utf-8", "replace")
+        snapshot_id = "dom-" + hashlib.sha1(raw).hexdigest()[:20]
+        with self._lock:
+            self.counters["puts"] += 1
+            if snapshot_id in self._snapshots:
+                self.counters["duplicates"] += 1
+                self._snapshots.move_to_end(snapshot_id)
+                return snapshot_id
+        compressed = zlib.compress(raw, 6)
+        with self._lock:
+            if snapshot_id not in self._snapshots:
+                self._snapshots[snapshot_id] = compressed
+                self._stored_bytes += len(compressed)
+                self.counters["raw_bytes"] += len(raw)
+                while self.max_bytes and self._stored_bytes > self.max_bytes and len(self._snapshots) > 1:
+                    _, evicted = self._snapshots.popitem(last=False)
+                    self._stored_bytes -= len(evicted)
+                    self.counters["evictions"] += 1
+        return snapshot_id
+
+    def get(self, snapshot_id: Optional[str]) -> Optional[str]:
+        """The snapshot's HTML, decompressed on demand, or None when it is not in the store."""
+        with self._lock:
+            compressed = self._snapshots.get(snapshot_id) if snapshot_id else None
+            if compressed is None:
+                return None
+            self._snapshots.move_to_end(snapshot_id)
+        return zlib.decompress(compressed).decode("utf-8")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"snapshots": len(self._snapshots), "stored_bytes": self._stored_bytes, **self.counters}
+
+
+_store: Optional[DomSnapshotStore] = None
+_source_store: Optional[DomSnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_dom_store() -> DomSnapshotStore:
+    """The snapshot store shared by every scenario in the process."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DomSnapshotStore(config.DOM_STORE_MAX_BYTES)
+        return _store
+
+
+def get_source_store() -> DomSnapshotStore:
+    """The store for unpruned page sources, bounded separately so they cannot push out pruned snapshots."""
+    global _source_store
+    with _store_lock:
+        if _source_store is None:
+            _source_store = DomSnapshotStore(config.DOM_SOURCE_STORE_MAX_BYTES)
+        return _source_store
+
+
+def store_snapshot(html: str) -> str:
+    return get_dom_store().put(html)
+
+
+def load_snapshot(snapshot_id: Optional[str]) -> Optional[str]:
+    return get_dom_store().get(snapshot_id)
+
+
+def store_source(html: str) -> str:
+    return get_source_store().put(html)
+
+
+def load_source(snapshot_id: Optional[str]) -> Optional[str]:
+    return get_source_store().get(snapshot_id)
+
+
+def dom_store_stats() -> Optional[dict]:
+    """Stats of the shared store (page sources under "sources"), or None when nothing was stored yet."""
+    if _store is None and _source_store is None:
+        return None
+    stats = _store.stats() if _store is not None else {}
+    if _source_store is not None:
+        stats["sources"] = _source_store.stats()
+    return stats
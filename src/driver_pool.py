@@ -0,0 +1,202 @@
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+
+import config
+
+
+@lru_cache(maxsize=None)
+def resolve_driver_path() -> str:
+    """Resolve the chromedriver binary once per process (CHROMEDRIVER_PATH skips the lookup)."""
+    if config.CHROMEDRIVER_PATH:
+        return config.CHROMEDRIVER_PATH
+    from webdriver_manager.chrome import ChromeDriverManager
+    return ChromeDriverManager().install()
+
+
+def launch_headless_chrome():
+    """Start a new headless Chrome using the cached driver binary."""
+    options = Options()
+    options.add_argument("--headless=new")
+    return webdriver.Chrome(service=Service(resolve_driver_path()), options=options)
+
+
+class DriverPool:
+    """
+    Process-wide pool of warm headless WebDrivers.
+    - checkout(): reuse an idle healthy driver, launch a new one while under max_size, otherwise wait.
+    - checkin(): reset cookies, storage and extra windows, park the driver on about:blank.
+    - Drivers older than max_age_s or used more than max_uses times are recycled.
+    - A checkout waits at most checkout_timeout_s (0: forever) unless given its own timeout.
+    """
+
+    def __init__(self, max_size: int, max_age_s: float, max_uses: int,
+                 factory: Callable[[], webdriver.Remote] = launch_headless_chrome, checkout_timeout_s: float = 0):
+        self.max_size = max_size
+        self.max_age_s = max_age_s
+        self.max_uses = max_uses
+        self.checkout_timeout_s = checkout_timeout_s
+        self.factory = factory
+        self._idle: List[webdriver.Remote] = []
+        self._meta: Dict[int, dict] = {}
+        self._launching = 0
+        self._condition = threading.Condition()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Drivers alive or being launched."""
+        return len(self._meta) + self._launching
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Pre-launch drivers so the first checkouts do not pay for browser startup."""
+        target = min(count or self.max_size, self.max_size)
+        while True:
+            with self._condition:
+                if self.size >= target:
+                    return
+                self._launching += 1
+            driver = self._launch()
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify()
+
+    def ensure_capacity(self, size: int) -> None:
+        """Grow the pool to at least `size` drivers, e.g. one per scenario a batch keeps in flight."""
+        with self._condition:
+            if size > self.max_size:
+                self.max_size = size
+                self._condition.notify_all()
+
+    def checkout(self, timeout: Optional[float] = None):
+        if timeout is None:
+            timeout = self.checkout_timeout_s or None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("Driver pool is closed")
+                if self._idle:
+                    driver = self._idle.pop()
+                elif self.size < self.max_size:
+                    self._launching += 1
+                    driver = None
+                else:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a free WebDriver")
+                    self._condition.wait(remaining)
+                    continue
+
+            if driver is None:
+                driver = self._launch()
+            elif self._expired(driver) or not self._is_healthy(driver):
+                self._discard(driver)
+                continue
+
+            self._meta[id(driver)]["uses"] += 1
+            return driver
+
+    def checkin(self, driver) -> None:
+        meta = self._meta.get(id(driver))
+        if meta is None:
+            driver.quit()
+            return
+        if self._closed or self._expired(driver) or not self._reset(driver):
+            self._discard(driver)
+            return
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        driver = self.checkout(timeout)
+        try:
+            yield driver
+        finally:
+            self.checkin(driver)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for driver in idle:
+            self._discard(driver)
+
+    def _launch(self):
+        """Start a driver for a slot already counted in self._launching."""
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._condition:
+                self._launching -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._launching -= 1
+            self._meta[id(driver)] = {"created": time.monotonic(), "uses": 0}
+        return driver
+
+    def _discard(self, driver) -> None:
+        with self._condition:
+            self._meta.pop(id(driver), None)
+            self._condition.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _expired(self, driver) -> bool:
+        meta = self._meta[id(driver)]
+        return time.monotonic() - meta["created"] > self.max_age_s or meta["uses"] >= self.max_uses
+
+    @staticmethod
+    def _is_healthy(driver) -> bool:
+        try:
+            driver.window_handles
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver) -> bool:
+        """Return the driver to a clean state; False if the browser no longer responds."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass  # storage is not accessible on every origin (e.g. about:blank, file://)
+            driver.get("about:blank")
+            return True
+        except Exception:
+            return False
+
+
+_pool: Optional[DriverPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> DriverPool:
+    """Return the process-wide driver pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(config.DRIVER_POOL_SIZE, config.DRIVER_MAX_AGE_S, config.DRIVER_MAX_USES,
+                               checkout_timeout_s=config.DRIVER_CHECKOUT_TIMEOUT_S)
+            atexit.register(_pool.close)
+        return _pool
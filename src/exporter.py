@@ -0,0 +1,148 @@
+import csv
+import hashlib
+import json
+import os
+from typing import Iterable, Iterator, List, Optional
+
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".parquet": "parquet"}
+PARQUET_BATCH_SIZE = 1000
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot infer export format from '{path}', expected one of {sorted(FORMATS)}")
+    return FORMATS[extension]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet export requires pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+class TestCaseWriter:
+    """
+    Streaming writer for test cases: each case is written as soon as it is passed in,
+    so a plan is never materialised a second time (no DataFrame).
+    - csv / jsonl support append=True (the CSV header is reused from the existing file).
+    - parquet is written in row batches and cannot be appended to.
+    """
+
+    def __init__(self, path: str, fmt: Optional[str] = None, append: bool = False):
+        self.path = path
+        self.fmt = detect_format(path, fmt)
+        self.count = 0
+        self._csv_writer = None
+        self._parquet_writer = None
+        self._batch: List[dict] = []
+        self._fieldnames: Optional[List[str]] = None
+
+        exists = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if self.fmt == "parquet":
+            if append:
+                raise ValueError("Appending to a Parquet file is not supported; write a new file instead")
+            self._file = None
+        else:
+            self._file = open(path, "a" if exists else "w", encoding="utf-8", newline="")
+        if self.fmt == "csv" and exists:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                self._fieldnames = next(csv.reader(f))
+            self._csv_writer = csv.DictWriter(self._file, fieldnames=self._fieldnames, extrasaction="ignore")
+
+    def write(self, case: dict) -> None:
+        if self.fmt == "csv":
+            if self._csv_writer is None:
+                self._fieldnames = list(case)
+                self._csv_writer = csv.DictWriter(self._file, fieldnames=self._fieldnames, extrasaction="ignore")
+                self._csv_writer.writeheader()
+            self._csv_writer.writerow(case)
+        elif self.fmt == "jsonl":
+            self._file.write(json.dumps(case) + "\n")
+        else:
+            self._batch.append(case)
+            if len(self._batch) >= PARQUET_BATCH_SIZE:
+                self._flush_parquet()
+        self.count += 1
+
+    def write_all(self, cases: Iterable[dict]) -> int:
+        for case in cases:
+            self.write(case)
+        return self.count
+
+    def _flush_parquet(self) -> None:
+        if not self._batch:
+            return
+        pyarrow = _import_pyarrow()
+        table = pyarrow.Table.from_pylist(self._batch)
+        if self._parquet_writer is None:
+            self._parquet_writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table)
+        self._batch = []
+
+    def close(self) -> None:
+        if self.fmt == "parquet":
+            self._flush_parquet()
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+        elif self._file is not None:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_test_cases(cases: Iterable[dict], path: str, fmt: Optional[str] = None, append: bool = False) -> int:
+    """Write test cases to CSV, JSONL or Parquet; returns the number of cases written."""
+    with TestCaseWriter(path, fmt, append) as writer:
+        return writer.write_all(cases)
+
+
+def iter_test_cases(path: str, fmt: Optional[str] = None) -> Iterator[dict]:
+    """Lazily read test cases back, one dict at a time."""
+    fmt = detect_format(path, fmt)
+    if fmt == "csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                if row.get("test_case_id", "").isdigit():
+                    row["test_case_id"] = int(row["test_case_id"])
+                yield row
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        pyarrow = _import_pyarrow()
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(PARQUET_BATCH_SIZE):
+            yield from batch.to_pylist()
+
+
+def _fingerprint(case: dict, key: str) -> str:
+    content = json.dumps({k: str(v) for k, v in case.items() if k != key}, sort_keys=True)
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+def diff_test_plans(old_path: str, new_path: str, key: str = "test_case_id") -> dict:
+    """
+    Compare two exported plans by `key`. Only a fingerprint per case of the old plan is kept
+    in memory; the new plan is streamed. Returns the added, removed and changed keys.
+    """
+    old = {str(case[key]): _fingerprint(case, key) for case in iter_test_cases(old_path)}
+    added, changed = [], []
+    for case in iter_test_cases(new_path):
+        case_key = str(case[key])
+        fingerprint = old.pop(case_key, None)
+        if fingerprint is None:
+            added.append(case_key)
+        elif fingerprint != _fingerprint(case, key):
+            changed.append(case_key)
+    return {"added": added, "removed": list(old), "changed": changed}
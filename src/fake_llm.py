@@ -0,0 +1,81 @@
+import asyncio
+import json
+import re
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+# (regex searched in the last prompt message, canned response); the first match wins.
+# They target the benchmark fixture site (benchmarks/fixture_server.py): a search box with
+# id "q", a button with data-testid "search-button" and results with class "result".
+E2E_RESPONSES: List[Tuple[str, str]] = [
+    (r"Convert the following", json.dumps({"actions": [
+        "Navigate to the search page via the URL.",
+        "Enter the search term 'shoes' in the search input field.",
+        "Click the 'Search' button to submit the query.",
+        "Verify that the search results contain the term 'shoes'.",
+    ], "test_name": "search_ok"})),
+    # Prompts for the Playwright backend ask for async Playwright code (BROWSER_BACKEND=playwright)
+    (r"Playwright[\s\S]*<Action>:\s*Navigate", "assert page.url.startswith('http')"),
+    (r"Playwright[\s\S]*<Action>:\s*Enter", 'await page.fill("#q", "shoes")'),
+    (r"Playwright[\s\S]*<Action>:\s*Click", 'await page.click("[data-testid=\'search-button\']")'),
+    (r"Playwright[\s\S]*<Action>:\s*Verify", 'await expect(page.locator(".result").first).to_be_visible()\n'
+                                             'assert "shoes" in await page.content()'),
+    (r"<Action>:\s*Navigate", "assert driver.current_url.startswith('http')"),
+    (r"<Action>:\s*Enter", 'driver.find_element(By.ID, "q").send_keys("shoes")'),
+    (r"<Action>:\s*Click", 'driver.find_element(By.CSS_SELECTOR, "[data-testid=\'search-button\']").click()'),
+    (r"<Action>:\s*Verify", 'WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.CLASS_NAME, "result")))\n'
+                            'assert "shoes" in driver.page_source'),
+]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model for offline runs and benchmarks, pluggable with config.set_llm()
+    or LLM_PROVIDER=fake. Every call sleeps latency_ms and answers with the first canned
+    response whose pattern matches the prompt, or `default` when none does.
+    """
+
+    responses: Sequence[Tuple[str, str]] = E2E_RESPONSES
+    default: str = "driver.title"
+    latency_ms: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def respond(self, messages: List[BaseMessage]) -> str:
+        prompt = str(messages[-1].content) if messages else ""
+        for pattern, response in self.responses:
+            if re.search(pattern, prompt):
+                return response
+        return self.default
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        self.calls += 1
+        content = self.respond(messages)
+        prompt_tokens = sum(len(str(m.content)) for m in messages) // 4 + 1
+        completion_tokens = len(content) // 4 + 1
+        message = AIMessage(content=content, usage_metadata={
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self._result(messages)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return self._result(messages)
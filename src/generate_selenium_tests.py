@@ -1,5 +1,6 @@
 
 import asyncio
+from browser_backend import run_with_backend
 from workflow import run_workflow
 
 if __name__ == "__main__":
@@ -10,4 +11,5 @@ if __name__ == "__main__":
         result = await run_workflow(query, target_url)
        # print("Final State:", result)
 
-    asyncio.run(main())
+    # Closes the shared browser (Playwright) before the event loop shuts down
+    asyncio.run(run_with_backend(main()))
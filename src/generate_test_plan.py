@@ -1,21 +1,16 @@
 import os
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
-from langgraph.graph import StateGraph, END
-from langchain.prompts import PromptTemplate
-from langchain.schema import SystemMessage, HumanMessage
+import sys
+import uuid
+from difflib import SequenceMatcher
 
+from typing import Dict, TypedDict, List
+import config
+from requirement_sections import RequirementSection, split_requirement
+from exporter import TestCaseWriter, detect_format
+from plan_manifest import MANIFEST_VERSION, empty_manifest, load_manifest, manifest_path, save_manifest
 
-from typing import TypedDict, List
-import pandas as pd
-from pydantic import BaseModel, Field
-
-
-load_dotenv()
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
-
-if not GROQ_API_KEY:
-    raise ValueError("Missing GROQ_API_KEY in .env")
+DEFAULT_REQUIREMENT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "requirements.txt")
+DEFAULT_EXPORT_PATH = "test_cases.csv"
 
 # AI Prompt using LangChain PromptTemplate
 LLM_SYSTEM_PROMPT = """
@@ -30,83 +25,201 @@ Do not add extra fields or text outside the schema.
 
 """
 
-class TestCase(BaseModel):
-    test_case_id: int = Field(..., description="Unique identifier for the test case.")
-    test_title: str = Field(..., description="Title of the test case.")
-    description: str = Field(..., description="Detailed description of what the test case covers.")
-    preconditions: str = Field(..., description="Any setup required before execution.")
-    test_steps: str = Field(..., description="Step-by-step execution guide.")
-    test_data: str = Field(..., description="Input values required for the test.")
-    expected_result: str = Field(..., description="The anticipated outcome.")
-    comments: str = Field(..., description="Additional notes or observations.")
-
-class TestPlan(BaseModel):
-    test_cases: List[TestCase]
-
-# Wrap LLM with structured output
-structured_llm = ChatGroq(
-    model="llama-3.1-8b-instant",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=2,
-    api_key=GROQ_API_KEY
-)
-llm_with_structured_output = structured_llm.with_structured_output(TestPlan)
+_llm_with_structured_output = None
+
+def get_structured_llm():
+    """The shared (cached) LLM wrapped with TestPlan structured output, built on first use."""
+    global _llm_with_structured_output
+    if _llm_with_structured_output is None:
+        from plan_schema import TestPlan
+
+        _llm_with_structured_output = config.get_llm().with_structured_output(TestPlan)
+    return _llm_with_structured_output
 
 class TestGenState(TypedDict):
+    requirement_path: str
     requirement: str
-    test_plan: List[dict]
+    sections: List[RequirementSection]
+    regenerate_all: bool
+    manifest: dict
+    test_case_count: int
+    export_path: str
+    exported_file: str
 
 def parse_requirement(state: TestGenState) -> TestGenState:
     """
     Node: Parse Requirement
-    Purpose: Prepare the requirement text for the LLM.
-    Input: state['requirement'] (string)
-    Output: state['requirement'] (string)
+    Purpose: Prepare the requirement text for the LLM, split into user stories / sections.
+    Input: state['requirement_path'] (optional, defaults to data/requirements.txt)
+    Output: state['requirement'] (string), state['sections'] (list of sections)
     """
-    with open("..\\data\\requirements.txt", "r") as f:
+    path = state.get("requirement_path") or DEFAULT_REQUIREMENT_PATH
+    with open(path, "r", encoding="utf-8") as f:
         state["requirement"] = f.read()
+    state["sections"] = split_requirement(state["requirement"], config.PLAN_SECTION_MAX_CHARS)
     return state
 
-def generate_test_cases(state: TestGenState) -> TestGenState:
-    """Generate structured test cases directly from requirement text."""
+async def generate_section_test_cases(section: RequirementSection) -> List[dict]:
+    """Generate structured test cases for one requirement section."""
+    from langchain.schema import SystemMessage, HumanMessage
+
     messages = [
     SystemMessage(content=LLM_SYSTEM_PROMPT),
-    HumanMessage(content=state["requirement"])
+    HumanMessage(content=section["text"])
 ]
-    resp = llm_with_structured_output.invoke(messages) 
-    print(resp)
+    resp = await get_structured_llm().ainvoke(messages)
     # resp is already a TestPlan object
-    state["test_plan"] = [tc.dict() for tc in resp.test_cases]
+    return [tc.dict() for tc in resp.test_cases]
+
+def _normalize(text) -> str:
+    return " ".join(str(text or "").lower().split())
+
+def _outcome_key(case: dict) -> str:
+    """What a case feeds in and expects; a positive and a negative case differ here."""
+    return f"{_normalize(case.get('test_data'))} | {_normalize(case.get('expected_result'))}"
+
+def _similarity_key(case: dict) -> str:
+    return _normalize(f"{case.get('test_title')} {case.get('test_steps')}")
+
+def _remember(cases: List[dict], seen: Dict[str, List[str]]) -> None:
+    for case in cases:
+        seen.setdefault(_outcome_key(case), []).append(_similarity_key(case))
+
+def drop_near_duplicates(cases: List[dict], seen: Dict[str, List[str]], similarity: float = 0.9) -> List[dict]:
+    """
+    Drop cases that repeat a case of another section in `seen`: same test data and expected result
+    (ignoring case and whitespace) and title and steps at least `similarity` alike. Then add this
+    section's cases to `seen`; cases of one section are never compared with each other.
+    """
+    kept = []
+    for case in cases:
+        key = _similarity_key(case)
+        if any(SequenceMatcher(None, key, other).quick_ratio() >= similarity
+               and SequenceMatcher(None, key, other).ratio() >= similarity
+               for other in seen.get(_outcome_key(case), ())):
+            continue
+        kept.append(case)
+    _remember(cases, seen)
+    return kept
+
+async def generate_test_cases(state: TestGenState) -> TestGenState:
+    """
+    Generate structured test cases for new or changed sections only, concurrently.
+    Sections whose hash is in the manifest of the previous run keep their test cases and IDs;
+    new cases get IDs after the highest ever issued; cases of deleted sections are dropped.
+    """
+    previous = empty_manifest() if state.get("regenerate_all") \
+        else load_manifest(manifest_path(state.get("export_path") or DEFAULT_EXPORT_PATH))
+    cached = previous["sections"]
+    changed = list({s["hash"]: s for s in state["sections"] if s["hash"] not in cached}.values())
+    print(f"Generating test cases for {len(changed)} of {len(state['sections'])} requirement sections")
+
+    import asyncio  # not imported at module level, to keep `import generate_test_plan` fast
+
+    semaphore = asyncio.Semaphore(config.PLAN_CONCURRENCY)
+
+    async def generate(section: RequirementSection) -> List[dict]:
+        async with semaphore:
+            return await generate_section_test_cases(section)
+
+    plans = await asyncio.gather(*(generate(section) for section in changed))
+    generated = {section["hash"]: plan for section, plan in zip(changed, plans)}
+
+    seen: Dict[str, List[str]] = {}
+    for section in state["sections"]:
+        if section["hash"] in cached:
+            _remember(cached[section["hash"]]["test_cases"], seen)
+    next_id = previous["next_id"]
+    sections = {}
+    # Cases are streamed to the export as each section is merged; the manifest is the only copy kept
+    export_path = state.get("export_path") or DEFAULT_EXPORT_PATH
+    with TestCaseWriter(_partial_path(export_path), detect_format(export_path)) as writer:
+        for section in state["sections"]:
+            if section["hash"] in sections:
+                continue
+            if section["hash"] in cached:
+                cases = cached[section["hash"]]["test_cases"]
+            else:
+                cases = []
+                for case in drop_near_duplicates(generated.pop(section["hash"]), seen):
+                    cases.append(dict(case, test_case_id=next_id))
+                    next_id += 1
+            writer.write_all(cases)
+            sections[section["hash"]] = {"title": section["title"], "test_cases": cases}
+
+    state["manifest"] = {"version": MANIFEST_VERSION, "next_id": next_id, "sections": sections}
+    state["test_case_count"] = writer.count
+    print(f"Test plan has {writer.count} test cases")
     return state
 
 
-def export_tests(state: TestGenState, file_path="test_cases.csv") -> TestGenState:
-    """Node: Export all tests to CSV and display DataFrame."""
-    df = pd.DataFrame(state.get("test_plan", []))
-    df.to_csv(file_path, index=False)
+def _partial_path(export_path: str) -> str:
+    """Where the plan is written while it is generated; the previous export stays intact until then."""
+    return f"{export_path}.partial"
+
+
+def export_tests(state: TestGenState) -> TestGenState:
+    """
+    Node: Publish the plan streamed by generate_test_cases (CSV, JSONL or Parquet by extension),
+    together with the section manifest used by the next run.
+    """
+    file_path = state.get("export_path") or DEFAULT_EXPORT_PATH
+    os.replace(_partial_path(file_path), file_path)
+    save_manifest(manifest_path(file_path), state["manifest"])
     state["exported_file"] = file_path
     return state
 
-workflow = StateGraph(TestGenState)
-workflow.add_node("parse", parse_requirement)
-workflow.add_node("generate_tests", generate_test_cases)
-workflow.add_node("export", export_tests)
+def build_workflow():
+    """Build the test-plan graph; LangGraph is only imported when a plan is actually generated."""
+    from langgraph.graph import StateGraph, END
+    from tracing import traced_node
 
-workflow.set_entry_point("parse")
+    workflow = StateGraph(TestGenState)
+    workflow.add_node("parse", traced_node("parse", parse_requirement))
+    workflow.add_node("generate_tests", traced_node("generate_tests", generate_test_cases))
+    workflow.add_node("export", traced_node("export", export_tests))
 
-# Normal flow
-workflow.add_edge("parse", "generate_tests")
-workflow.add_edge("generate_tests", "export")
+    workflow.set_entry_point("parse")
 
+    # Normal flow
+    workflow.add_edge("parse", "generate_tests")
+    workflow.add_edge("generate_tests", "export")
 
-workflow.add_edge("export", END)
 
-app = workflow.compile()
+    workflow.add_edge("export", END)
+    return workflow
 
+_app = None
 
-if __name__ == "__main__":
-    result = app.invoke({})
+def get_app():
+    """The compiled graph, compiled on first use."""
+    global _app
+    if _app is None:
+        _app = build_workflow().compile()
+    return _app
+
+async def run_test_plan(state: TestGenState) -> TestGenState:
+    """Run the test-plan graph with per-node tracing; the run summary is returned under 'trace_summary'."""
+    from tracing import LLMTraceHandler, trace_run
+
+    with trace_run(uuid.uuid4().hex, "test_plan") as tracer:
+        result = await get_app().ainvoke(state, {"callbacks": [LLMTraceHandler()]})
+    result["trace_summary"] = tracer.summary()
+    return result
 
+def __getattr__(name):
+    # `generate_test_plan.app` still works, compiled lazily
+    if name == "app":
+        return get_app()
+    # The output schema needs pydantic, so it is only imported when asked for
+    if name in ("TestCase", "TestPlan"):
+        import plan_schema
+        return getattr(plan_schema, name)
+    raise AttributeError(f"module 'generate_test_plan' has no attribute '{name}'")
+
+
+if __name__ == "__main__":
+    import asyncio
 
+    requirement_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_REQUIREMENT_PATH
+    result = asyncio.run(run_test_plan({"requirement_path": requirement_path}))
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import List, Optional
+
+import groq
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from langchain_groq import ChatGroq
+
+import config
+import tracing
+from rate_limiter import get_rate_limiter
+
+
+def estimate_call_tokens(messages: List[BaseMessage]) -> int:
+    """Prompt tokens (about four characters each) plus the expected completion."""
+    return sum(len(str(m.content)) for m in messages) // 4 + config.LLM_COMPLETION_TOKENS_ESTIMATE
+
+
+def _used_tokens(result: ChatResult) -> Optional[int]:
+    usage = (result.llm_output or {}).get("token_usage") or {}
+    return usage.get("total_tokens")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after")) if response is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (groq.RateLimitError, groq.APITimeoutError, groq.APIConnectionError)):
+        return True
+    return isinstance(error, groq.APIStatusError) and error.status_code >= 500
+
+
+class RateLimitedChatGroq(ChatGroq):
+    """
+    ChatGroq whose requests go through the shared RateLimiter.
+    The client's own retries are off: 429s, timeouts and 5xx are retried here (up to LLM_MAX_RETRIES),
+    so every attempt is budgeted and a throttled call slows down all callers instead of retrying alone.
+    Each call has a deadline of LLM_DEADLINE_S for queueing plus retries. Cache hits never reach this code.
+    """
+
+    def _attempt_failed(self, error: BaseException, estimate: int, started: float, attempt: int,
+                        deadline: float) -> float:
+        """
+        Return the slot of a failed attempt to the limiter; returns the back-off before retrying, or re-raises.
+        A cancelled call (CancelledError, KeyboardInterrupt) releases its slot without adapting the limit.
+        """
+        if not isinstance(error, Exception):
+            get_rate_limiter().release(estimate, None, 0.0, adapt=False)
+            raise error
+        throttled = isinstance(error, groq.RateLimitError)
+        get_rate_limiter().release(estimate, None, time.monotonic() - started, throttled, _retry_after(error))
+        if not _is_retryable(error) or attempt >= config.LLM_MAX_RETRIES:
+            raise error
+        # A 429 already pauses the limiter for every caller; other errors back off exponentially
+        backoff = 0.0 if throttled else min(2 ** attempt, 10)
+        if time.monotonic() + backoff > deadline:
+            raise error
+        tracing.increment("llm_retries")
+        return backoff
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs) -> ChatResult:
+        limiter = get_rate_limiter()
+        estimate = estimate_call_tokens(messages)
+        deadline = time.monotonic() + config.LLM_DEADLINE_S
+        attempt = 0
+        while True:
+            waited = await limiter.acquire(estimate, deadline)
+            tracing.increment("llm_queue_ms", round(waited * 1000))
+            started = time.monotonic()
+            try:
+                result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+            except BaseException as e:
+                # Every way out of the call, cancellation included, hands the slot back
+                backoff = self._attempt_failed(e, estimate, started, attempt, deadline)
+            else:
+                limiter.release(estimate, _used_tokens(result), time.monotonic() - started)
+                return result
+            await asyncio.sleep(backoff)
+            attempt += 1
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs) -> ChatResult:
+        limiter = get_rate_limiter()
+        estimate = estimate_call_tokens(messages)
+        deadline = time.monotonic() + config.LLM_DEADLINE_S
+        attempt = 0
+        while True:
+            waited = limiter.acquire_sync(estimate, deadline)
+            tracing.increment("llm_queue_ms", round(waited * 1000))
+            started = time.monotonic()
+            try:
+                result = super()._generate(messages, stop, run_manager, **kwargs)
+            except BaseException as e:
+                backoff = self._attempt_failed(e, estimate, started, attempt, deadline)
+            else:
+                limiter.release(estimate, _used_tokens(result), time.monotonic() - started)
+                return result
+            time.sleep(backoff)
+            attempt += 1
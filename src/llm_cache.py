@@ -0,0 +1,123 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Optional, Sequence
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import Generation
+
+
+CACHE_MODES = ("off", "readwrite", "replay")
+
+
+class CacheMissError(LookupError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+
+class DiskLLMCache(BaseCache):
+    """
+    Content-addressed LLM response cache stored in a single SQLite file.
+    - Key: sha256 of the LLM configuration string (model, temperature, ...) and the rendered prompt.
+    - Value: zlib-compressed serialized generations.
+    - Eviction: least recently used entries are dropped once the store exceeds max_bytes.
+    - Replay mode: a miss raises CacheMissError instead of calling the provider.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024, replay: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\x00{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Generation]]:
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+
+        if row is None:
+            if self.replay:
+                raise CacheMissError(f"No recorded LLM response for key {key} (LLM_CACHE_MODE=replay).")
+            return None
+        return loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Generation]) -> None:
+        if self.replay:
+            return
+        key = self.make_key(prompt, llm_string)
+        value = zlib.compress(dumps(list(return_val)).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), time.time())
+            )
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def clear(self, **kwargs) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the store fits in max_bytes. Caller holds the lock."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+def build_llm_cache(mode: str, path: str, max_bytes: int) -> Optional[DiskLLMCache]:
+    """Create the cache for the given LLM_CACHE_MODE, or None when caching is off."""
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Invalid LLM_CACHE_MODE '{mode}', expected one of {CACHE_MODES}")
+    if mode == "off":
+        return None
+    return DiskLLMCache(path, max_bytes=max_bytes, replay=(mode == "replay"))
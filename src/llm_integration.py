@@ -3,7 +3,6 @@ from langchain_core.prompts import ChatPromptTemplate
 from langchain.prompts.chat import SystemMessagePromptTemplate, HumanMessagePromptTemplate
 from models import ActionList, TestGenState
 import config
-llm = config.llm
 
 
 async def convert_user_instruction_to_actions(state: TestGenState) -> TestGenState:
@@ -22,12 +21,15 @@ async def convert_user_instruction_to_actions(state: TestGenState) -> TestGenSta
             ),
             HumanMessagePromptTemplate.from_template(
                 """
-                Convert the following <Input> into a JSON dictionary with the key "actions" and a list of atomic steps as its value.
+                Convert the following <Input> into a JSON dictionary with the key "actions" and a list of atomic steps as its value,
+                and the key "test_name" with a short snake_case name for the test.
                 These steps will later be used to generate end-to-end test scripts.
                 Each action should be a clear, atomic step that can be translated into code.
                 Aim to generate the minimum number of actions needed to accomplish what the user intends to test.
                 The first action must always be navigating to the target URL.
                 The last action should always be asserting the expected outcome of the test.
+                The test name has at most 10 characters, only lowercase letters, digits and underscores,
+                and no filler words like "verify", "should" or "results_appear".
                 Do not add any extra characters, comments, or explanations outside of this JSON structure. Only output the JSON result.
 
                 Examples:
@@ -38,7 +40,8 @@ async def convert_user_instruction_to_actions(state: TestGenState) -> TestGenSta
                         "Enter the search term for example 'LangChain' in the 'Search' input field.",
                         "Click the 'Search' button to submit the query.",
                         "Verify that the search results contain the term 'LangChain'."
-                    ]
+                    ],
+                    "test_name": "search_ok"
                 }}
 
                 Input: "Test adding item to the shopping cart."
@@ -48,7 +51,8 @@ async def convert_user_instruction_to_actions(state: TestGenState) -> TestGenSta
                         "Click on the first product in the listing to open product details",
                         "Click the 'Add to Cart' button to add the selected item",
                         "Expect the selected item name appears in the shopping cart sidebar or page"
-                    ]
+                    ],
+                    "test_name": "cart_add"
                 }}
 
                 <Inptut>: {query}
@@ -58,9 +62,11 @@ async def convert_user_instruction_to_actions(state: TestGenState) -> TestGenSta
         ]
     )
 
-    chain = chat_template | llm | output_parser
+    chain = chat_template | config.get_llm() | output_parser
 
-    actions_structure = chain.invoke({"query": state["query"]})
+    actions_structure = await chain.ainvoke({"query": state["query"]})
     state["actions"]=actions_structure.actions
+    # The test name comes with the actions, saving a separate naming call later
+    state["test_name"] = actions_structure.test_name
     print(state["actions"])
     return state
\ No newline at end of file
@@ -0,0 +1,228 @@
+import ast
+import difflib
+import hashlib
+import re
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+from soupsieve import SelectorSyntaxError
+
+from dom_index import HTML_PARSER
+
+try:
+    import lxml.html
+    from lxml.etree import XPathError
+except ImportError:
+    lxml = None
+
+
+# By.<NAME> attribute -> the strategy string Selenium sends (code may use either form)
+BY_STRATEGIES = {
+    "ID": "id", "NAME": "name", "XPATH": "xpath", "CSS_SELECTOR": "css selector", "CLASS_NAME": "class name",
+    "TAG_NAME": "tag name", "LINK_TEXT": "link text", "PARTIAL_LINK_TEXT": "partial link text",
+}
+FIND_METHODS = {"find_element", "find_elements"}
+# Calls after which the page may have changed, so later locators cannot be checked against the snapshot
+# (ActionChains hovers reveal menus: move_to_element(...).perform())
+PAGE_CHANGING_METHODS = {"click", "submit", "get", "back", "forward", "refresh", "execute_script", "switch_to",
+                         "move_to_element", "perform", "double_click", "context_click"}
+SUBMIT_KEYS = {"ENTER", "RETURN"}
+MAX_CANDIDATES = 3
+_QUOTED_RE = re.compile(r"""["']([^"']+)["']""")
+
+
+class Locator(NamedTuple):
+    strategy: str
+    value: str
+    single: bool  # find_element (one element expected) rather than find_elements
+    line: int
+
+
+class LocatorIssue(NamedTuple):
+    locator: Locator
+    problem: str  # "missing", "ambiguous" or "invalid"
+    matches: int
+    candidates: List[str]
+
+    def describe(self) -> str:
+        text = f"line {self.locator.line}: {self.locator.strategy} '{self.locator.value}' is {self.problem}"
+        if self.problem == "ambiguous":
+            text += f" ({self.matches} matches)"
+        if self.candidates:
+            text += "; candidates: " + ", ".join(f"({candidate})" for candidate in self.candidates)
+        return text
+
+
+def _strategy(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Attribute) and node.attr in BY_STRATEGIES:
+        return BY_STRATEGIES[node.attr]
+    if isinstance(node, ast.Constant) and node.value in BY_STRATEGIES.values():
+        return node.value
+    return None
+
+
+def _end(node: ast.AST) -> tuple:
+    return node.end_lineno, node.end_col_offset
+
+
+def _changes_page(call: ast.Call) -> bool:
+    if not isinstance(call.func, ast.Attribute):
+        return False
+    if call.func.attr in PAGE_CHANGING_METHODS:
+        return True
+    # send_keys(Keys.ENTER) submits the form
+    return call.func.attr == "send_keys" and any(
+        isinstance(arg, ast.Attribute) and arg.attr in SUBMIT_KEYS for arg in call.args
+    )
+
+
+def extract_locators(code: str) -> List[Locator]:
+    """
+    Locators of an action snippet that can be checked against the DOM captured before it:
+    literal find_element(s) locators and (By, value) tuples, up to the first call that may change
+    the page (click, submit, navigation, Enter key). Locators inside WebDriverWait conditions are
+    skipped, since they wait for elements that are not there yet.
+    """
+    tree = ast.parse(code)
+    waited = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in ("until", "until_not"):
+            waited.update(id(child) for child in ast.walk(node))
+
+    calls = sorted((node for node in ast.walk(tree) if isinstance(node, ast.Call)), key=_end)
+    cutoff = next((_end(call) for call in calls if _changes_page(call)), None)
+
+    locators = []
+    for node in ast.walk(tree):
+        if not hasattr(node, "end_lineno") or id(node) in waited or (cutoff and _end(node) > cutoff):
+            continue
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in FIND_METHODS:
+            pair, single = node.args[:2], node.func.attr == "find_element"
+        elif isinstance(node, ast.Tuple) and len(node.elts) == 2:
+            pair, single = node.elts, True
+        else:
+            continue
+        if len(pair) == 2 and _strategy(pair[0]) and isinstance(pair[1], ast.Constant) \
+                and isinstance(pair[1].value, str):
+            locators.append(Locator(_strategy(pair[0]), pair[1].value, single, node.lineno))
+    return sorted(set(locators), key=lambda locator: locator.line)
+
+
+class LocatorResolver:
+    """One parse of a DOM snapshot that resolves Selenium locators the way the browser would."""
+
+    def __init__(self, html: str):
+        self.html = html
+        self.soup = BeautifulSoup(html, HTML_PARSER)
+        self._tree = None
+
+    def select(self, strategy: str, value: str) -> Optional[list]:
+        """Elements matching the locator (None when it cannot be checked); raises ValueError for an invalid one."""
+        try:
+            if strategy == "id":
+                return self.soup.find_all(id=value)
+            if strategy == "name":
+                return self.soup.find_all(attrs={"name": value})
+            if strategy == "class name":
+                if not value.strip() or len(value.split()) > 1:
+                    raise ValueError("compound class names are not permitted")
+                return self.soup.find_all(class_=value)
+            if strategy == "tag name":
+                return self.soup.find_all(value)
+            if strategy == "css selector":
+                return self.soup.select(value)
+            if strategy in ("link text", "partial link text"):
+                links = [(a, " ".join(a.get_text(" ").split())) for a in self.soup.find_all("a")]
+                if strategy == "link text":
+                    return [a for a, text in links if text == value.strip()]
+                return [a for a, text in links if value.strip() in text]
+            if strategy == "xpath" and lxml is not None:
+                if self._tree is None:
+                    self._tree = lxml.html.fromstring(self.html)
+                result = self._tree.xpath(value)
+                return result if isinstance(result, list) else [result]
+        except SelectorSyntaxError as e:
+            raise ValueError(str(e).splitlines()[0]) from e
+        except Exception as e:
+            if lxml is not None and isinstance(e, XPathError):
+                raise ValueError(str(e)) from e
+            raise
+        return None
+
+    def candidates(self, locator: Locator) -> List[str]:
+        """Close attribute values and link texts of the snapshot, as ready-to-use locators."""
+        vocabulary = {}
+        for el in self.soup.find_all(True):
+            for attribute, fix in (("id", 'By.ID, "{}"'), ("name", 'By.NAME, "{}"'),
+                                   ("data-testid", 'By.CSS_SELECTOR, "[data-testid=\'{}\']"')):
+                if el.get(attribute):
+                    vocabulary.setdefault(el[attribute], fix.format(el[attribute]))
+            if el.name == "a":
+                text = " ".join(el.get_text(" ").split())
+                if text:
+                    vocabulary.setdefault(text, f'By.LINK_TEXT, "{text}"')
+        matches = difflib.get_close_matches(locator.value, list(vocabulary), n=MAX_CANDIDATES, cutoff=0.6)
+        if not matches:
+            # CSS/XPath expressions: compare the quoted values they contain, e.g. [data-testid='...']
+            for word in _QUOTED_RE.findall(locator.value):
+                matches += difflib.get_close_matches(word, list(vocabulary), n=MAX_CANDIDATES, cutoff=0.6)
+        return [vocabulary[m] for m in dict.fromkeys(matches)][:MAX_CANDIDATES]
+
+    def unique_alternatives(self, elements: list) -> List[str]:
+        """For an ambiguous locator, unique id / data-testid locators of the elements it matched."""
+        alternatives = []
+        for el in elements:
+            if not hasattr(el, "get"):
+                continue  # XPath text or attribute result
+            if el.get("id") and len(self.soup.find_all(id=el.get("id"))) == 1:
+                alternatives.append(f'By.ID, "{el.get("id")}"')
+            elif el.get("data-testid") and len(self.soup.find_all(attrs={"data-testid": el.get("data-testid")})) == 1:
+                alternatives.append(f'By.CSS_SELECTOR, "[data-testid=\'{el.get("data-testid")}\']"')
+            if len(alternatives) >= MAX_CANDIDATES:
+                break
+        return alternatives
+
+
+_resolver_cache: "OrderedDict[str, LocatorResolver]" = OrderedDict()
+RESOLVER_CACHE_SIZE = 8
+
+
+def get_resolver(html: str) -> LocatorResolver:
+    """Resolver for a snapshot, parsed only the first time the same DOM is seen."""
+    key = hashlib.sha1(html.encode("utf-8", "ignore")).hexdigest()
+    resolver = _resolver_cache.get(key)
+    if resolver is None:
+        resolver = LocatorResolver(html)
+        _resolver_cache[key] = resolver
+        if len(_resolver_cache) > RESOLVER_CACHE_SIZE:
+            _resolver_cache.popitem(last=False)
+    else:
+        _resolver_cache.move_to_end(key)
+    return resolver
+
+
+def verify_locators(code: str, html: str) -> List[LocatorIssue]:
+    """
+    Resolve the checkable locators of an action snippet against the DOM snapshot it was written for.
+    Missing and invalid locators are errors; a find_element locator matching several elements is
+    reported as ambiguous (Selenium silently uses the first one).
+    """
+    locators = extract_locators(code)
+    if not locators:
+        return []
+    resolver = get_resolver(html)
+    issues = []
+    for locator in locators:
+        try:
+            elements = resolver.select(locator.strategy, locator.value)
+        except ValueError as e:
+            issues.append(LocatorIssue(locator, f"invalid ({e})", 0, []))
+            continue
+        if elements is None:
+            continue
+        if not elements:
+            issues.append(LocatorIssue(locator, "missing", 0, resolver.candidates(locator)))
+        elif len(elements) > 1 and locator.single:
+            issues.append(LocatorIssue(locator, "ambiguous", len(elements), resolver.unique_alternatives(elements)))
+    return issues
@@ -1,6 +1,7 @@
-from typing import TypedDict, Annotated, List, Sequence
+from typing import TypedDict, Annotated, List, Optional, Sequence
 from pydantic import BaseModel, Field
 from langchain.schema import HumanMessage, AIMessage
+from script_builder import ActionBlock
 
 class TestGenState(TypedDict):
     messages: Annotated[Sequence[HumanMessage | AIMessage], "The messages in the conversation"]
@@ -9,14 +10,22 @@ class TestGenState(TypedDict):
     target_url: Annotated[str, "Valid URL of the website to test."]
     current_action: Annotated[int, "The index of the current action to generate the code for."]
     current_action_code: Annotated[int, "Code for the current action."]
-    aggregated_raw_actions: Annotated[str, "Raw aggregation of the actions"]
+    action_blocks: Annotated[List[ActionBlock], "Validated action code blocks, in order, rendered into the script at the end."]
     script: Annotated[str, "The generated Playwright script."]
-    website_state: Annotated[str, "DOM state of the website."]
+    website_state: Annotated[str, "ID of the current DOM snapshot in the snapshot store (dom_store)."]
+    source_snapshot: Annotated[Optional[str], "ID of the unpruned page source the locators are verified against."]
     error_message: Annotated[str, "Message that occurred during the processing of the action."]
     minimal_dom: Annotated[str, "Relevant DOM snippet for current action"]
     test_evaluation_output: Annotated[str, "Evaluation of the final test script."]
+    test_result: Annotated[dict, "Structured result of running the generated test (status, duration, failing step, artifacts)."]
     test_name: Annotated[str, "Name of the generated test."]
     template_pw_script: Annotated[str, "Playwright script to obtain the DOM state."]
+    speculative_codes: Annotated[List[Optional[dict]], "Code generated ahead of time per action, with the DOM fingerprint it assumed."]
+    session_id: Annotated[str, "Identifier of the live browser session used for DOM capture."]
+    repair_attempts: Annotated[int, "Targeted repairs tried for the current action's code."]
+    abandoned_action: Annotated[Optional[dict], "Action given up after its repairs and regenerations failed (index, action, error)."]
+    regenerations: Annotated[int, "Full regenerations of the current action's code after its repairs failed."]
 
 class ActionList(BaseModel):
     actions: List[str] = Field(..., description="List of atomic actions for end-to-end testing")
+    test_name: Optional[str] = Field(None, description="Short snake_case name of the test, at most 10 characters")
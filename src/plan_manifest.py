@@ -0,0 +1,37 @@
+import json
+import os
+
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(export_path: str) -> str:
+    """The manifest lives next to the exported plan, e.g. test_cases.csv -> test_cases.csv.manifest.json."""
+    return f"{export_path}.manifest.json"
+
+
+def empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "next_id": 1, "sections": {}}
+
+
+def load_manifest(path: str) -> dict:
+    """
+    Load the section-hash -> test cases manifest of a previous run.
+    A missing or incompatible manifest means every section is treated as new.
+    """
+    if not os.path.exists(path):
+        return empty_manifest()
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != MANIFEST_VERSION:
+        print(f"Ignoring manifest {path} with unsupported version {manifest.get('version')}")
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(path: str, manifest: dict) -> None:
+    """Write the manifest atomically so an interrupted run never leaves it half-written."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,18 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class TestCase(BaseModel):
+    test_case_id: int = Field(..., description="Unique identifier for the test case.")
+    test_title: str = Field(..., description="Title of the test case.")
+    description: str = Field(..., description="Detailed description of what the test case covers.")
+    preconditions: str = Field(..., description="Any setup required before execution.")
+    test_steps: str = Field(..., description="Step-by-step execution guide.")
+    test_data: str = Field(..., description="Input values required for the test.")
+    expected_result: str = Field(..., description="The anticipated outcome.")
+    comments: str = Field(..., description="Additional notes or observations.")
+
+
+class TestPlan(BaseModel):
+    test_cases: List[TestCase]
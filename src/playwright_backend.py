@@ -0,0 +1,151 @@
+import asyncio
+import re
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+from playwright.async_api import Browser, Page, async_playwright, expect
+
+import config
+from dom_store import DomCapture, read_page_dom_async
+
+
+_playwright = None
+_browser: Optional[Browser] = None
+_browser_loop: Optional[asyncio.AbstractEventLoop] = None
+_browser_lock: Optional[asyncio.Lock] = None
+
+
+async def get_browser() -> Browser:
+    """
+    The one headless browser process of the running event loop, launched on first use.
+    Every scenario gets its own isolated context inside it instead of its own browser.
+    """
+    global _playwright, _browser, _browser_loop, _browser_lock
+    loop = asyncio.get_running_loop()
+    if _browser_loop is not loop:
+        # A new event loop (e.g. another asyncio.run) cannot use the previous loop's browser
+        _playwright, _browser, _browser_loop, _browser_lock = None, None, loop, asyncio.Lock()
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await getattr(_playwright, config.PLAYWRIGHT_BROWSER).launch(headless=True)
+    return _browser
+
+
+async def shutdown() -> None:
+    """Close the shared browser and the Playwright driver of the running loop."""
+    global _playwright, _browser
+    if _browser_loop is not asyncio.get_running_loop():
+        return
+    if _browser is not None:
+        await _browser.close()
+    if _playwright is not None:
+        await _playwright.stop()
+    _playwright, _browser = None, None
+
+
+def compile_async_action(code: str, name: str = "apply_action") -> Callable[[Page], Awaitable]:
+    """Turn one action snippet (awaiting on `page`) into `async def name(page)`."""
+    body = "\n".join("    " + line for line in code.split("\n")) if code.strip() else "    pass"
+    namespace = {"expect": expect, "re": re, "asyncio": asyncio}
+    exec(f"async def {name}(page):\n{body}\n", namespace)
+    return namespace[name]
+
+
+class PlaywrightSession:
+    """
+    Live page of one scenario in its own browser context (cookies and storage isolated),
+    the async counterpart of browser_session.BrowserSession.
+    """
+
+    def __init__(self, target_url: str):
+        self.target_url = target_url
+        self.context = None
+        self.page: Optional[Page] = None
+        self.applied = 0
+        self.diverged = False
+
+    async def open(self) -> "PlaywrightSession":
+        browser = await get_browser()
+        self.context = await browser.new_context()
+        self.page = await self.context.new_page()
+        await self.page.goto(self.target_url)
+        return self
+
+    async def apply(self, action_code: str) -> bool:
+        """Run one action snippet against the live page. A failure marks the session as diverged."""
+        try:
+            await compile_async_action(action_code)(self.page)
+        except Exception as e:
+            print(f"Browser session diverged while applying action {self.applied}: {e}")
+            self.diverged = True
+            return False
+        self.applied += 1
+        return True
+
+    async def replay(self, run_actions: Callable[[Page], Awaitable], applied: int) -> None:
+        """Resynchronise by reloading the target page and running the script's actions on this page."""
+        await self.page.goto(self.target_url)
+        await run_actions(self.page)
+        self.applied = applied
+        self.diverged = False
+
+    async def page_source(self) -> str:
+        return await self.page.content()
+
+    async def capture(self, with_source: bool = False) -> DomCapture:
+        """The page's pruned DOM, plus its unpruned source when asked for."""
+        return await read_page_dom_async(self.page, with_source)
+
+    async def close(self) -> None:
+        if self.context is not None:
+            await self.context.close()
+
+
+_sessions: Dict[str, PlaywrightSession] = {}
+
+
+def get_session(session_id: str) -> Optional[PlaywrightSession]:
+    return _sessions.get(session_id)
+
+
+async def open_session(session_id: str, target_url: str) -> PlaywrightSession:
+    """Open a live session for a scenario, replacing any previous one with the same id."""
+    await close_session(session_id)
+    session = await PlaywrightSession(target_url).open()
+    _sessions[session_id] = session
+    return session
+
+
+async def close_session(session_id: str) -> None:
+    session = _sessions.pop(session_id, None)
+    if session is not None:
+        await session.close()
+
+
+class BrowserRunner:
+    """
+    Runs async Playwright scenarios from synchronous pytest tests: one event loop thread and one
+    browser per test process, a fresh context per scenario. Used by the generated suite's conftest.
+    """
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="playwright-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, scenario: Callable[[Page], Awaitable], timeout: float = config.TEST_TIMEOUT_S):
+        return asyncio.run_coroutine_threadsafe(self._in_context(scenario), self._loop).result(timeout)
+
+    async def _in_context(self, scenario: Callable[[Page], Awaitable]):
+        context = await (await get_browser()).new_context()
+        try:
+            return await scenario(await context.new_page())
+        finally:
+            await context.close()
+
+    def close(self) -> None:
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(30)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
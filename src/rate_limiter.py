@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+import config
+
+
+POLL_S = 0.05
+MAX_SLEEP_S = 1.0
+DEFAULT_BACKOFF_S = 2.0
+
+
+class RateLimiter:
+    """
+    Process-wide budget for LLM calls: token buckets for requests and tokens per minute, plus
+    an adaptive concurrency limit (AIMD). The limit grows by about one call per round of
+    successful calls, is halved on a 429 (and calls pause for the provider's Retry-After),
+    and shrinks slowly while latency is above the target.
+    A budget of 0 means unlimited. Works from any thread or event loop; waiting callers poll,
+    so no lock is tied to one loop.
+    """
+
+    def __init__(self, rpm: int, tpm: int, max_concurrency: int, latency_target_s: float):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max(max_concurrency, 1)
+        self.latency_target_s = latency_target_s
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._refilled = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "throttled": 0, "slow": 0, "tokens": 0, "wait_s": 0.0, "max_waiting": 0}
+
+    def _refill(self, now: float) -> None:
+        elapsed, self._refilled = now - self._refilled, now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Reserve a slot and the budget of one call, or return how long to wait before trying again."""
+        now = time.monotonic()
+        with self._lock:
+            self._refill(now)
+            waits = [self._blocked_until - now]
+            if self.in_flight >= int(self.limit):
+                waits.append(POLL_S)
+            if self.rpm and self._requests < 1:
+                waits.append((1 - self._requests) * 60 / self.rpm)
+            if self.tpm and self._tokens < min(tokens, self.tpm):
+                waits.append((min(tokens, self.tpm) - self._tokens) * 60 / self.tpm)
+            wait = max(waits)
+            if wait > 0:
+                return wait
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+            self.in_flight += 1
+            self.counters["calls"] += 1
+            return 0.0
+
+    def _enter_queue(self) -> None:
+        with self._lock:
+            self.waiting += 1
+            self.counters["max_waiting"] = max(self.counters["max_waiting"], self.waiting)
+
+    def _leave_queue(self, waited: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+            self.counters["wait_s"] += waited
+
+    def _next_sleep(self, wait: float, started: float, deadline: Optional[float]) -> float:
+        if deadline is not None and time.monotonic() + wait > deadline:
+            raise TimeoutError(f"LLM call not scheduled within its deadline (queued {time.monotonic() - started:.1f}s)")
+        return min(wait, MAX_SLEEP_S)
+
+    async def acquire(self, tokens: int, deadline: Optional[float] = None) -> float:
+        """Wait for a slot (async); returns the seconds spent queueing. Raises TimeoutError past `deadline`."""
+        started = time.monotonic()
+        self._enter_queue()
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if not wait:
+                    return time.monotonic() - started
+                await asyncio.sleep(self._next_sleep(wait, started, deadline))
+        finally:
+            self._leave_queue(time.monotonic() - started)
+
+    def acquire_sync(self, tokens: int, deadline: Optional[float] = None) -> float:
+        """Blocking variant of acquire() for synchronous callers."""
+        started = time.monotonic()
+        self._enter_queue()
+        try:
+            while True:
+                wait = self._try_acquire(tokens)
+                if not wait:
+                    return time.monotonic() - started
+                time.sleep(self._next_sleep(wait, started, deadline))
+        finally:
+            self._leave_queue(time.monotonic() - started)
+
+    def release(self, estimated_tokens: int, used_tokens: Optional[int], latency_s: float,
+                throttled: bool = False, retry_after_s: Optional[float] = None, adapt: bool = True) -> None:
+        """
+        Return the slot, settle the token estimate against actual usage and adapt the concurrency limit
+        (not for a cancelled call, which says nothing about the provider).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.in_flight -= 1
+            if not adapt:
+                return
+            if used_tokens is not None:
+                self.counters["tokens"] += used_tokens
+                if self.tpm:
+                    self._tokens = max(self._tokens - (used_tokens - estimated_tokens), -self.tpm)
+            if throttled:
+                self.counters["throttled"] += 1
+                self.limit = max(1.0, self.limit / 2)
+                self._blocked_until = max(self._blocked_until, now + (retry_after_s or DEFAULT_BACKOFF_S))
+            elif self.latency_target_s and latency_s > self.latency_target_s:
+                self.counters["slow"] += 1
+                self.limit = max(1.0, self.limit * 0.9)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    def stats(self) -> dict:
+        """Queue depth, in-flight calls, current limit, remaining budgets and counters."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "queue_depth": self.waiting,
+                "in_flight": self.in_flight,
+                "concurrency_limit": round(self.limit, 2),
+                "requests_left": round(self._requests, 1) if self.rpm else None,
+                "tokens_left": round(self._tokens) if self.tpm else None,
+                **{k: round(v, 3) if isinstance(v, float) else v for k, v in self.counters.items()},
+            }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The limiter shared by every LLM call in the process."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(config.LLM_RPM, config.LLM_TPM, config.LLM_MAX_CONCURRENCY,
+                                   config.LLM_LATENCY_TARGET_S)
+        return _limiter
+
+
+def limiter_stats() -> Optional[dict]:
+    """Stats of the shared limiter, or None when no rate-limited call was made yet."""
+    return _limiter.stats() if _limiter is not None else None
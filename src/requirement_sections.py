@@ -0,0 +1,82 @@
+import hashlib
+import re
+from typing import List, TypedDict
+
+
+class RequirementSection(TypedDict):
+    title: str
+    text: str
+    hash: str
+
+
+# Lines that start a new user story or section: markdown headings, "User Story ...", "Story 3", "US-12 ..."
+HEADING_RE = re.compile(r"^\s*(#{1,6}\s+\S.*|user\s+story\b.*|story\s*[-#:]?\s*\d+.*|us-?\d+\b.*)$", re.IGNORECASE)
+
+
+def section_hash(text: str) -> str:
+    """Hash of a section's content, insensitive to whitespace-only edits."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _make_section(lines: List[str]) -> RequirementSection:
+    text = "\n".join(lines).strip()
+    title = next((line.strip().lstrip("#").strip() for line in lines if line.strip()), "")
+    return {"title": title[:120], "text": text, "hash": section_hash(text)}
+
+
+def _split_long(lines: List[str], max_chars: int) -> List[List[str]]:
+    """
+    Split an oversized section into parts of at most max_chars, repeating its heading line on every
+    part. Parts end at the last paragraph break that fits, else at a line break; a single line longer
+    than a part is cut.
+    """
+    heading = lines[0][:max_chars // 2]
+    budget = max_chars - len(heading)  # for the body lines, each with its newline
+    pieces = []
+    for line in lines[1:]:
+        while len(line) >= budget:
+            pieces.append(line[:budget - 1])
+            line = line[budget - 1:]
+        pieces.append(line)
+
+    parts, current, size = [], [], 0
+    for line in pieces:
+        while current and size + len(line) + 1 > budget:
+            blank = next((i for i in range(len(current) - 1, 0, -1) if not current[i].strip()), None)
+            cut = blank if blank else len(current)
+            parts.append(current[:cut])
+            current = current[cut + 1 if blank else cut:]
+            size = sum(len(l) + 1 for l in current)
+        current.append(line)
+        size += len(line) + 1
+    parts.append(current)
+    return [[heading] + part for part in parts if any(line.strip() for line in part)]
+
+
+def split_requirement(text: str, max_chars: int = 6000) -> List[RequirementSection]:
+    """
+    Split a requirement document into sections, one per user story or heading.
+    Text before the first heading belongs to the first section; a document without
+    headings is one section. Sections longer than max_chars are split, preferably at paragraph breaks.
+    """
+    blocks: List[List[str]] = []
+    current: List[str] = []
+    heading_seen = False
+    for line in text.splitlines():
+        if HEADING_RE.match(line):
+            # A preamble before the first heading stays with the first story
+            if heading_seen and any(l.strip() for l in current):
+                blocks.append(current)
+                current = []
+            heading_seen = True
+        current.append(line)
+    if any(l.strip() for l in current):
+        blocks.append(current)
+
+    sections = []
+    for lines in blocks:
+        parts = _split_long(lines, max_chars) if len("\n".join(lines)) > max_chars else [lines]
+        sections.extend(_make_section(part) for part in parts)
+    return sections
+
@@ -0,0 +1,137 @@
+import atexit
+import io
+import os
+import queue
+import shutil
+import threading
+from typing import Optional
+
+import config
+
+
+def should_capture(index: int, policy: str = config.SCREENSHOT_POLICY, every_n: int = config.SCREENSHOT_EVERY_N) -> bool:
+    """Whether the test takes a screenshot after action `index`; failures are captured under every policy."""
+    if policy == "always":
+        return True
+    if policy == "every_n":
+        return (index + 1) % max(every_n, 1) == 0
+    return False
+
+
+def run_artifact_dir(run_id: str) -> str:
+    return os.path.join(config.ARTIFACT_DIR, run_id)
+
+
+def _prune_old_runs(keep: int) -> None:
+    """Delete the oldest run directories so at most `keep` remain under ARTIFACT_DIR."""
+    if keep <= 0 or not os.path.isdir(config.ARTIFACT_DIR):
+        return
+    runs = [entry for entry in os.scandir(config.ARTIFACT_DIR) if entry.is_dir()]
+    runs.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in runs[:-keep]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _pillow_available() -> bool:
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class ScreenshotWriter:
+    """
+    Background thread that encodes and writes screenshots, so a test step only pays for
+    grabbing the PNG from the browser. The queue is bounded: when the disk cannot keep up,
+    capture blocks instead of buffering without limit.
+    """
+
+    def __init__(self, max_width: int = config.SCREENSHOT_MAX_WIDTH, fmt: str = config.SCREENSHOT_FORMAT,
+                 quality: int = config.SCREENSHOT_QUALITY, queue_size: int = 16):
+        self.max_width = max_width
+        self.fmt = fmt.lower()
+        self.quality = quality
+        if (self.max_width or self.fmt != "png") and not _pillow_available():
+            print("Pillow is not installed (pip install pillow); screenshots are written as full-size PNG")
+            self.max_width, self.fmt = 0, "png"
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=queue_size)
+        self._known_dirs = set()
+        self._thread = threading.Thread(target=self._run, name="screenshot-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def extension(self) -> str:
+        return "jpg" if self.fmt == "jpeg" else self.fmt
+
+    def submit(self, png: bytes, run_id: str, name: str) -> str:
+        """Queue a PNG for writing; returns the path it will be written to."""
+        path = os.path.join(run_artifact_dir(run_id), f"{name}.{self.extension}")
+        self._queue.put((png, path))
+        return path
+
+    def flush(self) -> None:
+        """Block until every queued screenshot is on disk."""
+        self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            png, path = self._queue.get()
+            try:
+                directory = os.path.dirname(path)
+                if directory not in self._known_dirs:
+                    os.makedirs(directory, exist_ok=True)
+                    self._known_dirs.add(directory)
+                    _prune_old_runs(config.ARTIFACT_KEEP_RUNS)
+                with open(path, "wb") as f:
+                    f.write(self._encode(png))
+            except Exception as e:
+                print(f"Could not write screenshot {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _encode(self, png: bytes) -> bytes:
+        if not self.max_width and self.fmt == "png":
+            return png
+        from PIL import Image
+
+        image = Image.open(io.BytesIO(png))
+        if self.max_width and image.width > self.max_width:
+            image = image.resize((self.max_width, round(image.height * self.max_width / image.width)))
+        if self.fmt == "jpeg":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format=self.fmt.upper(), quality=self.quality, optimize=True)
+        return out.getvalue()
+
+
+_writer: Optional[ScreenshotWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> ScreenshotWriter:
+    """The process-wide writer, started on first capture and drained at exit."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ScreenshotWriter()
+            atexit.register(_writer.flush)
+        return _writer
+
+
+def capture_screenshot(driver, run_id: str, name: str) -> Optional[str]:
+    """Grab a screenshot and hand it to the background writer. Never fails the test it is called from."""
+    try:
+        return get_writer().submit(driver.get_screenshot_as_png(), run_id, name)
+    except Exception as e:
+        print(f"Screenshot {name} failed: {e}")
+        return None
+
+
+async def capture_page_screenshot(page, run_id: str, name: str) -> Optional[str]:
+    """capture_screenshot() for an async Playwright page."""
+    try:
+        return get_writer().submit(await page.screenshot(), run_id, name)
+    except Exception as e:
+        print(f"Screenshot {name} failed: {e}")
+        return None
@@ -0,0 +1,322 @@
+import hashlib
+import os
+import re
+from typing import List, Optional, TypedDict
+
+import config
+from screenshots import should_capture
+
+
+class ActionBlock(TypedDict):
+    index: int
+    code: str
+    source_action: str
+    screenshot: bool
+
+
+SCRIPT_TEMPLATE = """
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from driver_pool import get_pool
+
+def launch_browser():
+    # Warm driver from the process-wide pool (driver binary resolved once)
+    return get_pool().checkout()
+
+def navigate_to(driver, url: str):
+    driver.get(url)
+
+def get_dom_state(driver):
+    return driver.page_source
+
+def close_browser(driver):
+    # Reset the driver and hand it back to the pool
+    get_pool().checkin(driver)
+
+def run_actions(driver):
+{actions}
+    return driver
+
+def get_page_dom():
+    driver = launch_browser()
+    try:
+        navigate_to(driver, "{target_url}")
+        run_actions(driver)
+        dom_state = get_dom_state(driver)
+        return dom_state
+    finally:
+        close_browser(driver)
+
+def open_browser_and_navigate():
+    driver = launch_browser()
+    navigate_to(driver, "{target_url}")
+    return driver
+"""
+
+# Async Playwright counterpart: actions await on a Page that the caller opens in its own context
+PLAYWRIGHT_SCRIPT_TEMPLATE = """
+import re
+from playwright.async_api import expect
+
+async def run_actions(page):
+{actions}
+    return page
+"""
+
+# What a test module needs of the script: imports, navigation and the actions; the DOM-capture
+# helpers above (pool checkout, get_page_dom, ...) stay out of generated tests.
+TEST_PRELUDE_TEMPLATE = """
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+def navigate_to(driver, url: str):
+    driver.get(url)
+
+def run_actions(driver):
+{actions}
+    return driver
+"""
+
+# A test module has no side effects at import time: the browser comes from the `driver` fixture
+# of the suite's conftest, so collecting hundreds of modules never starts Chrome.
+TEST_TEMPLATE = """
+from screenshots import capture_screenshot
+
+# Screenshots go to ARTIFACT_DIR/<RUN_ID>/ through a background writer
+RUN_ID = "{run_id}"
+TARGET_URL = "{target_url}"
+
+{script}
+
+def take_global_screenshot(driver):
+    capture_screenshot(driver, RUN_ID, "global")
+
+def global_assertion_hook(driver):
+    # Example global verification
+    assert driver.title != "", "Page title is empty"
+
+
+def {test_name}(driver):
+    navigate_to(driver, TARGET_URL)
+    try:
+        run_actions(driver)
+
+        # Global verification
+        {global_screenshot}global_assertion_hook(driver)
+    except Exception:
+        capture_screenshot(driver, RUN_ID, "failure")
+        raise
+"""
+
+# The pytest test stays synchronous: the conftest's browser_runner runs the async scenario in
+# a fresh context of the worker's one browser process.
+PLAYWRIGHT_TEST_TEMPLATE = """
+from screenshots import capture_page_screenshot
+
+# Screenshots go to ARTIFACT_DIR/<RUN_ID>/ through a background writer
+RUN_ID = "{run_id}"
+TARGET_URL = "{target_url}"
+
+{script}
+
+async def global_assertion_hook(page):
+    # Example global verification
+    assert await page.title() != "", "Page title is empty"
+
+
+async def scenario(page):
+    await page.goto(TARGET_URL)
+    try:
+        await run_actions(page)
+
+        # Global verification
+        {global_screenshot}await global_assertion_hook(page)
+    except Exception:
+        await capture_page_screenshot(page, RUN_ID, "failure")
+        raise
+
+
+def {test_name}(browser_runner):
+    browser_runner.run(scenario)
+"""
+
+# Shared by every module of a generated suite. Each pytest process (or xdist worker) gets its
+# own pool, created on first use; every test leases a reset driver and returns it afterwards.
+# Playwright modules share one browser per process instead; it is only started when requested.
+# The generator's src/ directory (screenshots, driver_pool, playwright_backend) goes on sys.path,
+# so the suite runs with plain pytest; TESTGEN_SRC_DIR points elsewhere when the suite is moved.
+CONFTEST_TEMPLATE = """
+import os
+import sys
+
+import pytest
+
+SRC_DIR = os.environ.get("TESTGEN_SRC_DIR", {src_dir!r})
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+@pytest.fixture(scope="session")
+def driver_pool():
+    from driver_pool import get_pool
+
+    return get_pool()
+
+
+@pytest.fixture
+def driver(driver_pool):
+    driver = driver_pool.checkout()
+    try:
+        yield driver
+    finally:
+        driver_pool.checkin(driver)
+
+
+@pytest.fixture(scope="session")
+def browser_runner():
+    from playwright_backend import BrowserRunner
+
+    runner = BrowserRunner()
+    try:
+        yield runner
+    finally:
+        runner.close()
+"""
+
+_SCRIPT_TEMPLATES = {"selenium": SCRIPT_TEMPLATE, "playwright": PLAYWRIGHT_SCRIPT_TEMPLATE}
+_TEST_TEMPLATES = {"selenium": TEST_TEMPLATE, "playwright": PLAYWRIGHT_TEST_TEMPLATE}
+# Playwright's script template already holds nothing but the actions
+_TEST_PRELUDE_TEMPLATES = {"selenium": TEST_PRELUDE_TEMPLATE, "playwright": PLAYWRIGHT_SCRIPT_TEMPLATE}
+_SCREENSHOT_CALLS = {
+    "selenium": 'capture_screenshot(driver, RUN_ID, "{name}")',
+    "playwright": 'await capture_page_screenshot(page, RUN_ID, "{name}")',
+}
+_GLOBAL_SCREENSHOT_CALLS = {
+    "selenium": "take_global_screenshot(driver)",
+    "playwright": 'await capture_page_screenshot(page, RUN_ID, "global")',
+}
+
+
+TEST_NAME_MAX_CHARS = 10
+# Words that say nothing about what a scenario tests
+_NAME_STOP_WORDS = {"test", "the", "a", "an", "to", "of", "and", "that", "on", "in", "for", "with", "is", "are",
+                    "it", "verify", "check", "ensure", "should", "results", "appear", "appears", "page", "website"}
+
+
+def derive_test_name(query: str, actions: List[str]) -> str:
+    """
+    Deterministic short snake_case name from the query (or the first action): as many of its
+    meaningful words as fit in TEST_NAME_MAX_CHARS characters. Used when the model gave no name.
+    """
+    for text in [query, *actions[:1]]:
+        words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _NAME_STOP_WORDS and len(w) > 1]
+        if words:
+            name = words[0][:TEST_NAME_MAX_CHARS]
+            for word in words[1:]:
+                if len(name) + 1 + len(word) > TEST_NAME_MAX_CHARS:
+                    break
+                name += "_" + word
+            return name
+    return "scenario"
+
+
+def test_function_name(name: str) -> str:
+    """A valid pytest function name: 'test_' + the name in lowercase snake_case."""
+    name = re.sub(r"\W+", "_", name.strip().lower()).strip("_") or "scenario"
+    return name if name.startswith("test_") else f"test_{name}"
+
+
+def make_action_block(index: int, code: str, source_action: str, screenshot: Optional[bool] = None) -> ActionBlock:
+    """An action block; by default whether it is followed by a screenshot comes from SCREENSHOT_POLICY."""
+    if screenshot is None:
+        screenshot = should_capture(index)
+    return {"index": index, "code": code, "source_action": source_action, "screenshot": screenshot}
+
+
+def render_actions(blocks: List[ActionBlock], indentation: str = "    ", screenshots: bool = False,
+                   backend: Optional[str] = None) -> str:
+    """Render the body of run_actions(driver) (or async run_actions(page)) from the ordered action blocks."""
+    backend = backend or config.BROWSER_BACKEND
+    lines = []
+    for block in blocks:
+        lines.append(f"{indentation}# Action {block['index']}")
+        lines.extend(indentation + line for line in block["code"].split("\n"))
+        if screenshots and block["screenshot"]:
+            lines.append(indentation + _SCREENSHOT_CALLS[backend].format(name=f"action_{block['index']}"))
+    return "\n".join(lines) if lines else f"{indentation}pass"
+
+
+def render_script(target_url: str, blocks: List[ActionBlock], screenshots: bool = False,
+                  backend: Optional[str] = None) -> str:
+    """
+    Render the helper script: browser setup, run_actions(driver) and DOM capture.
+    Screenshot calls are only rendered into the test module, never into DOM capture replays.
+    backend defaults to BROWSER_BACKEND as configured at call time.
+    """
+    backend = backend or config.BROWSER_BACKEND
+    return _SCRIPT_TEMPLATES[backend].format(
+        actions=render_actions(blocks, screenshots=screenshots, backend=backend), target_url=target_url
+    )
+
+
+def render_test_module(target_url: str, blocks: List[ActionBlock], test_name: str, run_id: Optional[str] = None,
+                       backend: Optional[str] = None) -> str:
+    """Render the final pytest module for a scenario; its screenshots go to ARTIFACT_DIR/<run_id>."""
+    backend = backend or config.BROWSER_BACKEND
+    global_screenshot = _GLOBAL_SCREENSHOT_CALLS[backend] + "\n        " if config.SCREENSHOT_POLICY == "always" else ""
+    return _TEST_TEMPLATES[backend].format(
+        script=_TEST_PRELUDE_TEMPLATES[backend].format(actions=render_actions(blocks, screenshots=True, backend=backend)),
+        test_name=test_name,
+        run_id=run_id or test_name,
+        target_url=target_url,
+        global_screenshot=global_screenshot,
+    )
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def render_conftest(src_dir: str = SRC_DIR) -> str:
+    return CONFTEST_TEMPLATE.format(src_dir=src_dir)
+
+
+def suite_module_name(test_name: str, run_id: str) -> str:
+    """File name of a scenario's module: unique per run, even when two scenarios share a test name."""
+    return f"{test_name}_{hashlib.sha1(run_id.encode('utf-8')).hexdigest()[:8]}.py"
+
+
+def write_test_module(directory: str, module_name: str, script: str) -> str:
+    """Write one module of a generated suite, adding the shared conftest.py if the directory has none."""
+    os.makedirs(directory, exist_ok=True)
+    conftest_path = os.path.join(directory, "conftest.py")
+    if not os.path.exists(conftest_path):
+        with open(conftest_path, "w", encoding="utf-8") as f:
+            f.write(render_conftest())
+    path = os.path.join(directory, module_name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(script)
+    return path
+
+
+def previous_actions_context(blocks: List[ActionBlock], window: int = config.PREVIOUS_ACTIONS_WINDOW,
+                             summaries: int = config.PREVIOUS_ACTIONS_SUMMARIES) -> str:
+    """
+    Bounded context of what already ran: the code of the last `window` blocks verbatim, the
+    `summaries` blocks before them as one-line summaries of their source action, and everything
+    older collapsed into one line, so the prompt does not grow with the scenario.
+    """
+    older, recent = blocks[:-window] if window else blocks, blocks[-window:] if window else []
+    collapsed, summarized = older[:-summaries] if summaries else older, older[-summaries:] if summaries else []
+    parts = []
+    if collapsed:
+        first, last = collapsed[0]["index"], collapsed[-1]["index"]
+        parts.append(f"# Actions {first}-{last} done" if first != last else f"# Action {first} done")
+    parts.extend(f"# Action {block['index']} (done): {block['source_action']}" for block in summarized)
+    parts.extend(f"# Action {block['index']}: {block['source_action']}\n{block['code']}" for block in recent)
+    return "\n".join(parts)
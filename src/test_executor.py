@@ -0,0 +1,177 @@
+import asyncio
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+from typing import List, Optional, Set, Tuple
+
+import config
+from screenshots import run_artifact_dir
+from script_builder import write_test_module
+
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+_OWN_FILES = {"junit.xml", "conftest.py", "__pycache__"}
+
+# Bounds how many generated tests run at once across the process; a semaphore belongs to one
+# event loop, so it is recreated for each asyncio.run()
+_worker_slots: Optional[Tuple[asyncio.AbstractEventLoop, asyncio.Semaphore]] = None
+# Work directories of tests still running, never pruned
+_active_workdirs: Set[str] = set()
+
+
+def _slots() -> asyncio.Semaphore:
+    global _worker_slots
+    loop = asyncio.get_running_loop()
+    if _worker_slots is None or _worker_slots[0] is not loop:
+        _worker_slots = (loop, asyncio.Semaphore(config.TEST_WORKERS))
+    return _worker_slots[1]
+
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    """Kill the pytest process and everything it spawned (browsers, drivers)."""
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+            return
+        # proc.kill() would leave Chrome and chromedriver running; taskkill /T ends the whole tree
+        killed = subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+        if killed.returncode != 0:
+            proc.kill()
+    except (ProcessLookupError, OSError):
+        pass
+
+
+def _prune_old_workdirs(keep: int) -> None:
+    """Delete the oldest kept work directories so at most `keep` remain under TEST_RUN_DIR."""
+    if keep <= 0 or not os.path.isdir(config.TEST_RUN_DIR):
+        return
+    runs = [entry for entry in os.scandir(config.TEST_RUN_DIR) if entry.is_dir() and entry.path not in _active_workdirs]
+    runs.sort(key=lambda entry: entry.stat().st_mtime)
+    for entry in runs[:-keep]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def _failing_step(script: str, test_file: str, report: str) -> Optional[int]:
+    """Map the last traceback line inside the generated module to the '# Action N' block containing it."""
+    line_numbers = re.findall(rf"{re.escape(os.path.basename(test_file))}:(\d+)", report)
+    if not line_numbers:
+        return None
+    lines = script.split("\n")
+    for line in reversed(lines[:int(line_numbers[-1])]):
+        match = re.match(r"\s*# Action (\d+)", line)
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def parse_junit(junit_path: str) -> dict:
+    """Summarise a JUnit XML report into counts, duration and the first failure message."""
+    summary = {"tests": 0, "failures": 0, "errors": 0, "skipped": 0, "duration_s": 0.0, "message": None, "report": ""}
+    if not os.path.exists(junit_path):
+        return summary
+    root = ET.parse(junit_path).getroot()
+    for suite in root.iter("testsuite"):
+        for key in ("tests", "failures", "errors", "skipped"):
+            summary[key] += int(suite.get(key, 0))
+        summary["duration_s"] += float(suite.get("time", 0))
+    for case in root.iter("testcase"):
+        for problem in list(case.findall("failure")) + list(case.findall("error")):
+            if summary["message"] is None:
+                summary["message"] = problem.get("message")
+                summary["report"] = problem.text or ""
+    return summary
+
+
+def _screenshots(run_id: str) -> List[str]:
+    screenshot_dir = run_artifact_dir(run_id)
+    if not os.path.isdir(screenshot_dir):
+        return []
+    return sorted(os.path.join(screenshot_dir, name) for name in os.listdir(screenshot_dir))
+
+
+async def run_generated_test(test_name: str, script: str, timeout: float = config.TEST_TIMEOUT_S,
+                             run_id: Optional[str] = None) -> dict:
+    """
+    Run one generated test in its own pytest process and temp directory.
+    The process is killed if it exceeds `timeout` seconds.
+    Returns a structured result: status, counts, duration, failing action index, artifacts and raw output.
+    Artifacts are the files the test left in its directory plus its screenshots (ARTIFACT_DIR/<run_id>).
+    The directory is deleted when the test passes without leaving files; the newest TEST_KEEP_RUNS
+    others are kept for inspection.
+    """
+    async with _slots():
+        os.makedirs(config.TEST_RUN_DIR, exist_ok=True)
+        workdir = tempfile.mkdtemp(prefix=f"{test_name}_", dir=config.TEST_RUN_DIR)
+        _active_workdirs.add(workdir)
+        # The module needs the suite's conftest.py for its driver fixture
+        test_file = write_test_module(workdir, f"{test_name}.py", script)
+        junit_path = os.path.join(workdir, "junit.xml")
+
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+
+        started = time.perf_counter()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", f"--junitxml={junit_path}", test_file,
+                cwd=workdir, env=env,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                start_new_session=(os.name == "posix")
+            )
+            timed_out = False
+            try:
+                output, _ = await asyncio.wait_for(proc.communicate(), timeout)
+            except asyncio.TimeoutError:
+                timed_out = True
+                _kill(proc)
+                output, _ = await proc.communicate()
+        except BaseException:
+            _active_workdirs.discard(workdir)
+            raise
+        wall_time = time.perf_counter() - started
+
+    summary = parse_junit(junit_path)
+    if timed_out:
+        status = "timeout"
+    elif summary["errors"] or (proc.returncode not in (0, 1)):
+        status = "error"
+    elif summary["failures"]:
+        status = "failed"
+    else:
+        status = "passed"
+
+    artifacts = sorted(
+        os.path.join(workdir, name) for name in os.listdir(workdir)
+        if name not in _OWN_FILES and name != os.path.basename(test_file)
+    )
+    _active_workdirs.discard(workdir)
+    if status == "passed" and not artifacts:
+        shutil.rmtree(workdir, ignore_errors=True)
+        workdir = None
+    else:
+        _prune_old_workdirs(config.TEST_KEEP_RUNS)
+
+    return {
+        "test_name": test_name,
+        "status": status,
+        "tests": summary["tests"],
+        "failures": summary["failures"],
+        "errors": summary["errors"],
+        "duration_s": round(wall_time, 3),
+        "failing_step": _failing_step(script, test_file, summary["report"]) if summary["report"] else None,
+        "message": summary["message"] or (f"Timed out after {timeout}s" if timed_out else None),
+        "artifacts": artifacts + _screenshots(run_id or test_name),
+        "workdir": workdir,
+        "output": output.decode("utf-8", "replace"),
+    }
+
+
+async def run_generated_tests(tests: List[Tuple[str, str]], timeout: float = config.TEST_TIMEOUT_S) -> List[dict]:
+    """Run many (test_name, script) pairs in parallel, at most TEST_WORKERS at a time."""
+    return await asyncio.gather(*(run_generated_test(name, script, timeout) for name, script in tests))
@@ -0,0 +1,215 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+import config
+
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("tracer", default=None)
+_current_span: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("span", default=None)
+
+
+class Tracer:
+    """
+    Collects the spans of one run (one scenario or one test plan).
+    Finished spans are appended to <TRACE_DIR>/<run_id>.jsonl; close() writes <run_id>.summary.json.
+    """
+
+    def __init__(self, run_id: str, name: str, trace_dir: Optional[str] = config.TRACE_DIR):
+        self.run_id = run_id
+        self.name = name
+        self.spans = []
+        self._lock = threading.Lock()
+        self._file = None
+        self.trace_dir = trace_dir
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+            self._file = open(os.path.join(trace_dir, f"{run_id}.jsonl"), "a", encoding="utf-8")
+
+    def record(self, span: dict) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if self._file is not None:
+                self._file.write(json.dumps(span, default=str) + "\n")
+
+    def summary(self) -> dict:
+        """Aggregate the spans: time per node and per kind, LLM latency, rate-limit queueing and tokens, DOM sizes, retries."""
+        nodes, kinds = {}, {}
+        llm = {"calls": 0, "latency_ms": 0.0, "queue_ms": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        dom = {"bytes": 0, "minimal_bytes": 0}
+        retries = 0
+        wall_ms = 0.0
+        # LLM spans finish before their parent node; visit them last so the node entry exists
+        for span in sorted(self.spans, key=lambda s: s["kind"] == "llm"):
+            kind, attrs = span["kind"], span["attrs"]
+            kinds[kind] = round(kinds.get(kind, 0.0) + span["duration_ms"], 3)
+            if kind == "run":
+                wall_ms = span["duration_ms"]
+            if kind == "node":
+                node = nodes.setdefault(span["name"], {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "llm_ms": 0.0})
+                node["count"] += 1
+                node["total_ms"] = round(node["total_ms"] + span["duration_ms"], 3)
+                node["max_ms"] = max(node["max_ms"], span["duration_ms"])
+                retries += attrs.get("retries", 0)
+                llm["queue_ms"] += attrs.get("llm_queue_ms", 0)
+                llm["retries"] += attrs.get("llm_retries", 0)
+                dom["bytes"] += attrs.get("dom_bytes", 0)
+                dom["minimal_bytes"] += attrs.get("minimal_dom_bytes", 0)
+            if kind == "llm":
+                llm["calls"] += 1
+                llm["latency_ms"] = round(llm["latency_ms"] + span["duration_ms"], 3)
+                llm["prompt_tokens"] += attrs.get("prompt_tokens", 0)
+                llm["completion_tokens"] += attrs.get("completion_tokens", 0)
+                parent_node = attrs.get("node")
+                if parent_node in nodes:
+                    nodes[parent_node]["llm_ms"] = round(nodes[parent_node]["llm_ms"] + span["duration_ms"], 3)
+        for node in nodes.values():
+            node["mean_ms"] = round(node["total_ms"] / node["count"], 3)
+        return {"run_id": self.run_id, "name": self.name, "wall_ms": wall_ms, "nodes": nodes,
+                "kinds": kinds, "llm": llm, "dom": dom, "retries": retries}
+
+    def close(self) -> dict:
+        summary = self.summary()
+        if self._file is not None:
+            self._file.close()
+            with open(os.path.join(self.trace_dir, f"{self.run_id}.summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        return summary
+
+
+@contextmanager
+def span(name: str, kind: str = "node", **attrs):
+    """Time a block as a child of the current span. Yields the span's attrs dict for annotations."""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield attrs
+        return
+    parent = _current_span.get()
+    current = {
+        "run_id": tracer.run_id,
+        "span_id": uuid.uuid4().hex[:16],
+        "parent_id": parent["span_id"] if parent else None,
+        "name": name,
+        "kind": kind,
+        "start": time.time(),
+        "attrs": attrs,
+    }
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield attrs
+    except Exception as e:
+        attrs["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        _current_span.reset(token)
+        tracer.record(current)
+
+
+def set_attrs(**attrs) -> None:
+    """Annotate the current span (no-op outside a traced run)."""
+    current = _current_span.get()
+    if current is not None:
+        current["attrs"].update(attrs)
+
+
+def increment(name: str, value: int = 1) -> None:
+    current = _current_span.get()
+    if current is not None:
+        current["attrs"][name] = current["attrs"].get(name, 0) + value
+
+
+@contextmanager
+def trace_run(run_id: str, name: str):
+    """Install a tracer for everything run inside the block; yields it. Its summary is written on exit."""
+    tracer = Tracer(run_id, name)
+    token = _current_tracer.set(tracer)
+    try:
+        with span(name, kind="run"):
+            yield tracer
+    finally:
+        _current_tracer.reset(token)
+        tracer.close()
+
+
+def traced_node(name: str, node: Callable) -> Callable:
+    """Wrap a LangGraph node (sync or async) so every invocation is recorded as a span."""
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def async_wrapper(state):
+            with span(name):
+                return await node(state)
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(state):
+        with span(name):
+            return node(state)
+    return wrapper
+
+
+class LLMTraceHandler(BaseCallbackHandler):
+    """LangChain callback recording every chat model call as an 'llm' span with latency and token usage."""
+
+    run_inline = True
+
+    def __init__(self):
+        self._started = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        parent = _current_span.get()
+        self._started[run_id] = (time.time(), time.perf_counter(), parent)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        self._finish(run_id, usage=_token_usage(response))
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, error=f"{type(error).__name__}: {error}")
+
+    def _finish(self, run_id, usage: Optional[dict] = None, error: Optional[str] = None) -> None:
+        tracer = _current_tracer.get()
+        started = self._started.pop(run_id, None)
+        if tracer is None or started is None:
+            return
+        start, perf_start, parent = started
+        attrs = dict(usage or {})
+        attrs["node"] = parent["name"] if parent else None
+        if error:
+            attrs["error"] = error
+        tracer.record({
+            "run_id": tracer.run_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": parent["span_id"] if parent else None,
+            "name": "llm",
+            "kind": "llm",
+            "start": start,
+            "duration_ms": round((time.perf_counter() - perf_start) * 1000, 3),
+            "attrs": attrs,
+        })
+
+
+def _token_usage(response) -> dict:
+    """Prompt/completion tokens from provider metadata (Groq token_usage or message usage_metadata)."""
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    if token_usage:
+        return {"prompt_tokens": token_usage.get("prompt_tokens", 0),
+                "completion_tokens": token_usage.get("completion_tokens", 0)}
+    for generations in response.generations:
+        for generation in generations:
+            usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if usage:
+                return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0)}
+    return {}
@@ -1,16 +1,34 @@
+import uuid
+
+import config
 from models import TestGenState
 from llm_integration import convert_user_instruction_to_actions
 
 from build_selenium_script import (
     selenium_template,
+    generate_code_for_action,
+    repair_action_code,
+    validate_generated_action,
     execute_test_case,
     post_process_script
 )
+from browser_backend import get_backend
+from checkpoints import discard_run, open_checkpointer, pending_nodes
 from dom_parser import  get_website_dom
+from tracing import LLMTraceHandler, trace_run, traced_node
 from langgraph.graph import StateGraph, END
 
-async def run_workflow(query: str, target_url: str):
-    """Run the LangGraph workflow"""
+async def run_workflow(query: str, target_url: str, run_id: str = None, checkpointer=None):
+    """
+    Run the LangGraph workflow.
+    Every node's output state is checkpointed under run_id (see CHECKPOINT_PATH); running again
+    with the run_id of a failed or interrupted run resumes after its last completed node.
+    """
+    if checkpointer is None and config.CHECKPOINT_PATH:
+        async with open_checkpointer() as checkpointer:
+            return await run_workflow(query, target_url, run_id, checkpointer)
+
+    run_id = run_id or uuid.uuid4().hex
     initial_state = {
         'messages': [],
         'query': query,
@@ -18,41 +36,106 @@ async def run_workflow(query: str, target_url: str):
         'target_url': target_url,
         'current_action': 0,
         'current_action_code': "",
-        'aggregated_raw_actions': "",
+        'action_blocks': [],
+        'speculative_codes': None,
         'script': None,
         'website_state': None,
+        'source_snapshot': None,
         'minimal_dom': None,
         'error_message': None,
         'test_name': None,
         'dom_script': None,
-        
+        'session_id': run_id,
+        'repair_attempts': 0,
+        'regenerations': 0,
+        'abandoned_action': None,
     }
 
-    result = await app.ainvoke(initial_state)
+    app = get_app(checkpointer)
+    run_config = {
+        "recursion_limit": config.WORKFLOW_RECURSION_LIMIT,
+        "callbacks": [LLMTraceHandler()],
+        "configurable": {"thread_id": run_id},
+    }
+    with trace_run(run_id, "e2e") as tracer:
+        try:
+            pending = await pending_nodes(app, run_config) if checkpointer is not None else ()
+            if pending:
+                # The live browser did not survive; the DOM capture node reopens it by replay
+                print(f"Resuming run {run_id} at {', '.join(pending)}")
+            else:
+                print(f"Starting run {run_id}")
+            result = await app.ainvoke(None if pending else initial_state, run_config)
+        finally:
+            # Release the live browser if the run stopped before post-processing closed it
+            await get_backend().close_session(run_id)
 
+    await discard_run(checkpointer, run_id)
+    result['trace_summary'] = tracer.summary()
     return result
 
-workflow = StateGraph(TestGenState)
-workflow.add_node("convertor", convert_user_instruction_to_actions)
-workflow.add_node("template", selenium_template)
 
-'''workflow.add_node("get_state", get_website_dom)
-workflow.add_node("generate_code", generate_code_for_action)
-workflow.add_node("validate", validate_generated_action)'''
-workflow.add_node("post_process", post_process_script)
-workflow.add_node("execute_test", execute_test_case)
+def route_after_validation(state: TestGenState) -> str:
+    """
+    Loop back for the next action, or finish once all actions are in.
+    Invalid code is repaired up to MAX_REPAIR_ATTEMPTS times, then regenerated up to
+    MAX_REGENERATIONS times; after that the script is finalised without the action and the run
+    is reported as incomplete.
+    """
+    if state.get("error_message"):
+        if state.get("repair_attempts", 0) < config.MAX_REPAIR_ATTEMPTS:
+            return "repair"
+        if state.get("regenerations", 0) < config.MAX_REGENERATIONS:
+            return "generate_code"
+        print(f"Stopping action generation: {state['error_message']}")
+        return "post_process"
+    if state["current_action"] < len(state["actions"]):
+        return "get_state"
+    return "post_process"
+
+
+def build_workflow() -> StateGraph:
+    workflow = StateGraph(TestGenState)
+    workflow.add_node("convertor", traced_node("convertor", convert_user_instruction_to_actions))
+    workflow.add_node("template", traced_node("template", selenium_template))
+    workflow.add_node("get_state", traced_node("get_state", get_website_dom))
+    workflow.add_node("generate_code", traced_node("generate_code", generate_code_for_action))
+    workflow.add_node("validate", traced_node("validate", validate_generated_action))
+    workflow.add_node("repair", traced_node("repair", repair_action_code))
+    workflow.add_node("post_process", traced_node("post_process", post_process_script))
+    workflow.add_node("execute_test", traced_node("execute_test", execute_test_case))
+
+    workflow.set_entry_point("convertor")
+
+    workflow.add_edge("convertor", "template")
+    workflow.add_edge("template", "get_state")
+    workflow.add_edge("get_state", "generate_code")
+    workflow.add_edge("generate_code", "validate")
+    workflow.add_conditional_edges("validate", route_after_validation, ["get_state", "repair", "generate_code", "post_process"])
+    workflow.add_edge("repair", "validate")
+    workflow.add_edge("post_process", "execute_test")
+    workflow.add_edge("execute_test", END)
+    return workflow
+
+
+_app = None
+_checkpointed_app = None
 
-workflow.set_entry_point("convertor")
 
-workflow.add_edge("convertor", "template")
-'''workflow.add_edge("template", "get_state")
-#workflow.add_edge("initializer", "get_state")
-workflow.add_edge("get_state", "generate_code")
-workflow.add_edge("generate_code", "validate")'''
-#workflow.add_edge("validate", "post_process")
-workflow.add_edge("template", "post_process")
-workflow.add_edge("post_process", "execute_test")
-workflow.add_edge("execute_test", END)
+def get_app(checkpointer=None):
+    """The compiled E2E graph, compiled on first use (once more for each checkpointer it is used with)."""
+    global _app, _checkpointed_app
+    if checkpointer is not None:
+        if _checkpointed_app is None or _checkpointed_app[0] is not checkpointer:
+            _checkpointed_app = (checkpointer, build_workflow().compile(checkpointer=checkpointer))
+        return _checkpointed_app[1]
+    if _app is None:
+        _app = build_workflow().compile()
+    return _app
 
 
-app = workflow.compile()
+def __getattr__(name):
+    # `workflow.app` still works, compiled lazily
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module 'workflow' has no attribute '{name}'")
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The application modules are flat files under src/, imported by bare name
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, os.path.abspath(SRC_DIR))
+
+# Keep tests offline: no response cache on disk, no traces, no checkpoints
+os.environ.setdefault("LLM_CACHE_MODE", "off")
+os.environ.setdefault("TRACE_DIR", "")
+os.environ.setdefault("CHECKPOINT_PATH", "")
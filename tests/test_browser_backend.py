@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+import browser_backend
+import config
+from build_selenium_script import validate_generated_action
+from dom_store import store_source
+from script_builder import make_action_block, render_test_module
+
+
+PLAYWRIGHT_BLOCKS = [
+    make_action_block(0, 'await page.fill("#q", "shoes")', "Type shoes", screenshot=True),
+    make_action_block(1, 'await page.click("#missing-in-dom")', "Click search", screenshot=False),
+]
+
+
+class OfflinePlaywrightBackend(browser_backend.PlaywrightBackend):
+    """Playwright prompts and validation, without a browser."""
+
+    async def apply_action(self, session_id, code):
+        pass
+
+
+def validate(code, monkeypatch):
+    monkeypatch.setattr(browser_backend, "_backend", OfflinePlaywrightBackend())
+    source = store_source('<html><body><input id="q"></body></html>')
+    state = {"current_action_code": code, "current_action": 0, "actions": ["Click search"], "action_blocks": [],
+             "source_snapshot": source, "session_id": None, "repair_attempts": 0, "regenerations": 0}
+    return asyncio.run(validate_generated_action(state))
+
+
+def test_playwright_test_module_is_async_and_uses_the_runner_fixture():
+    module = render_test_module("http://fixture.test/", PLAYWRIGHT_BLOCKS, "test_search", "run-1", backend="playwright")
+    compile(module, "test_search.py", "exec")
+    assert "async def run_actions(page):" in module
+    assert "def test_search(browser_runner):" in module
+    assert 'await capture_page_screenshot(page, RUN_ID, "action_0")' in module
+    assert '"action_1"' not in module
+
+
+def test_backend_defaults_to_the_setting_at_call_time(monkeypatch):
+    monkeypatch.setattr(config, "BROWSER_BACKEND", "playwright")
+    assert "async def run_actions(page):" in render_test_module("http://fixture.test/", PLAYWRIGHT_BLOCKS, "test_search")
+
+
+def test_unknown_backend_is_rejected(monkeypatch):
+    monkeypatch.setattr(browser_backend, "_backend", None)
+    monkeypatch.setattr(config, "BROWSER_BACKEND", "webkit-driver")
+    with pytest.raises(ValueError, match="Unknown BROWSER_BACKEND"):
+        browser_backend.get_backend()
+
+
+def test_playwright_actions_need_a_page_call(monkeypatch):
+    state = validate('driver.find_element(By.ID, "q").click()', monkeypatch)
+    assert "No async Playwright command (page.)" in state["error_message"]
+    assert state["action_blocks"] == []
+
+
+def test_playwright_actions_skip_the_locator_check(monkeypatch):
+    monkeypatch.setattr(config, "LOCATOR_CHECK", True)
+    state = validate('await page.click("#missing-in-dom")', monkeypatch)
+    assert state["error_message"] is None
+    assert state["current_action"] == 1 and len(state["action_blocks"]) == 1
@@ -0,0 +1,66 @@
+import os
+
+import dom_store
+from dom_store import DomSnapshotStore, read_page_dom
+from locator_check import verify_locators
+
+
+PAGE = ('<html><body><iframe id="checkout"></iframe>'
+        '<button class="close"><svg class="icon-close"></svg></button>'
+        '<nav><a class="menu">Menu</a><ul style="display:none"><li class="submenu-item">Item</li></ul></nav>'
+        '</body></html>')
+PRUNED = '<html><body><button class="close"></button><nav><a class="menu">Menu</a></nav></body></html>'
+
+
+class FakeDriver:
+    page_source = PAGE
+
+    def execute_script(self, script):
+        return PRUNED
+
+
+def test_capture_keeps_the_unpruned_source_only_when_asked():
+    assert read_page_dom(FakeDriver()) == (PRUNED, None)
+    assert read_page_dom(FakeDriver(), with_source=True) == (PRUNED, PAGE)
+
+
+def test_locators_of_pruned_elements_pass_against_the_source():
+    codes = [
+        'driver.switch_to.frame(driver.find_element(By.TAG_NAME, "iframe"))',
+        'driver.find_element(By.ID, "checkout")',
+        'driver.find_element(By.CSS_SELECTOR, "button svg.icon-close").click()',
+    ]
+    for code in codes:
+        assert verify_locators(code, PAGE) == []
+        assert verify_locators(code, PRUNED)  # what the pruned snapshot alone would reject
+
+
+def test_locators_after_a_hover_are_not_checked():
+    code = ('ActionChains(driver).move_to_element(driver.find_element(By.CLASS_NAME, "menu")).perform()\n'
+            'driver.find_element(By.CLASS_NAME, "not-rendered-yet").click()')
+    assert verify_locators(code, PRUNED) == []
+
+
+def test_store_dedupes_and_evicts_least_recently_used():
+    store = DomSnapshotStore(max_bytes=1)
+    first = store.put("<p>a</p>")
+    assert store.put("<p>a</p>") == first
+    assert store.get(first) == "<p>a</p>"
+    second = store.put("<p>b</p>")
+    assert store.get(first) is None
+    assert store.get(second) == "<p>b</p>"
+    assert store.stats()["duplicates"] == 1 and store.stats()["evictions"] == 1
+
+
+def test_large_sources_do_not_evict_pruned_snapshots(monkeypatch):
+    monkeypatch.setattr(dom_store, "_store", DomSnapshotStore(max_bytes=64 * 1024))
+    monkeypatch.setattr(dom_store, "_source_store", DomSnapshotStore(max_bytes=256 * 1024))
+    pruned = dom_store.store_snapshot(PRUNED)
+    # Incompressible multi-hundred-KB sources, as on heavy pages
+    sources = [dom_store.store_source(f"<html>{os.urandom(150 * 1024).hex()}</html>") for _ in range(4)]
+
+    assert dom_store.load_snapshot(pruned) == PRUNED
+    assert dom_store.load_source(sources[-1]) is not None
+    assert dom_store.load_source(sources[0]) is None  # sources are bounded by their own budget
+    stats = dom_store.dom_store_stats()
+    assert stats["evictions"] == 0 and stats["sources"]["evictions"] > 0
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+import browser_session
+from driver_pool import DriverPool
+
+
+class FakeDriver:
+    window_handles = ["main"]
+    fail_get = False
+
+    def get(self, url):
+        if self.fail_get and url != "about:blank":
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+
+    def delete_all_cookies(self):
+        pass
+
+    def execute_script(self, script):
+        pass
+
+    class switch_to:
+        @staticmethod
+        def window(handle):
+            pass
+
+    def quit(self):
+        pass
+
+
+def make_pool(size=1, timeout=0.1):
+    return DriverPool(size, max_age_s=600, max_uses=50, factory=FakeDriver, checkout_timeout_s=timeout)
+
+
+def test_checkout_times_out_when_the_pool_is_exhausted():
+    pool = make_pool()
+    pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout()
+
+
+def test_growing_the_pool_wakes_waiting_checkouts():
+    pool = make_pool(timeout=5)
+    pool.checkout()
+    leased = []
+    waiter = threading.Thread(target=lambda: leased.append(pool.checkout()))
+    waiter.start()
+    pool.ensure_capacity(2)
+    waiter.join(2)
+    assert len(leased) == 1 and pool.size == 2
+
+
+def test_session_returns_its_driver_when_navigation_fails(monkeypatch):
+    pool = make_pool()
+    monkeypatch.setattr(browser_session, "get_pool", lambda: pool)
+    monkeypatch.setattr(FakeDriver, "fail_get", True)
+    with pytest.raises(RuntimeError):
+        browser_session.BrowserSession("http://unreachable.test/")
+    monkeypatch.setattr(FakeDriver, "fail_get", False)
+    assert pool.checkout() is not None  # the slot was not leaked
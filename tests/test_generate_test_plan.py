@@ -0,0 +1,115 @@
+import asyncio
+
+import generate_test_plan
+from exporter import iter_test_cases
+from requirement_sections import split_requirement
+
+
+def make_case(title, steps, test_data="", expected_result=""):
+    return {"test_case_id": 0, "test_title": title, "description": title, "preconditions": "",
+            "test_steps": steps, "test_data": test_data, "expected_result": expected_result, "comments": ""}
+
+
+VALID_LOGIN = make_case("Login with valid credentials", "Enter username and password, click Login",
+                        "user / correct password", "The dashboard is shown")
+INVALID_LOGIN = make_case("Login with invalid credentials", "Enter username and password, click Login",
+                          "user / wrong password", "An error message is shown")
+
+
+def test_positive_and_negative_cases_of_one_section_are_kept():
+    seen = {}
+    assert generate_test_plan.drop_near_duplicates([VALID_LOGIN, INVALID_LOGIN], seen) == [VALID_LOGIN, INVALID_LOGIN]
+
+
+def test_identical_case_from_another_section_is_dropped():
+    seen = {}
+    generate_test_plan.drop_near_duplicates([VALID_LOGIN], seen)
+    repeated = dict(VALID_LOGIN, test_title="  login WITH valid credentials ", comments="other section")
+    assert generate_test_plan.drop_near_duplicates([repeated, INVALID_LOGIN], seen) == [INVALID_LOGIN]
+
+
+def test_reworded_case_from_another_section_is_dropped():
+    seen = {}
+    generate_test_plan.drop_near_duplicates([VALID_LOGIN, INVALID_LOGIN], seen)
+    reworded = dict(VALID_LOGIN, test_title="Log in with valid credentials",
+                    test_steps="Enter the username and password, then click Login",
+                    description="Checks a successful sign-in")
+    assert generate_test_plan.drop_near_duplicates([reworded], seen) == []
+
+
+def test_similar_case_with_another_outcome_is_kept_across_sections():
+    seen = {}
+    generate_test_plan.drop_near_duplicates([VALID_LOGIN], seen)
+    assert generate_test_plan.drop_near_duplicates([INVALID_LOGIN], seen) == [INVALID_LOGIN]
+
+
+def test_generate_test_cases_keeps_pairs_and_numbers_them(tmp_path, monkeypatch):
+    text = ("# Story 1: Login\nUsers log in with a password.\n\n"
+            "# Story 2: Clipboard\nPasting customer data is blocked outside approved tools.\n")
+    sections = split_requirement(text)
+    plans = {
+        sections[0]["hash"]: [VALID_LOGIN, INVALID_LOGIN],
+        sections[1]["hash"]: [
+            make_case("Paste customer data into personal email", "Copy a record, paste it into webmail",
+                      "customer record", "The paste is blocked"),
+            make_case("Paste customer data into internal CRM", "Copy a record, paste it into the CRM",
+                      "customer record", "The paste is allowed"),
+            VALID_LOGIN,
+        ],
+    }
+
+    async def fake_generate(section):
+        return plans[section["hash"]]
+
+    monkeypatch.setattr(generate_test_plan, "generate_section_test_cases", fake_generate)
+    export_path = str(tmp_path / "test_cases.jsonl")
+    state = {"sections": sections, "regenerate_all": True, "export_path": export_path}
+    state = generate_test_plan.export_tests(asyncio.run(generate_test_plan.generate_test_cases(state)))
+
+    plan = list(iter_test_cases(export_path))
+    titles = [case["test_title"] for case in plan]
+    assert titles == ["Login with valid credentials", "Login with invalid credentials",
+                      "Paste customer data into personal email", "Paste customer data into internal CRM"]
+    assert [case["test_case_id"] for case in plan] == [1, 2, 3, 4]
+    assert state["test_case_count"] == 4
+
+
+def test_unchanged_sections_keep_their_ids_across_runs(tmp_path, monkeypatch):
+    export_path = str(tmp_path / "test_cases.csv")
+    requested = []
+
+    async def fake_generate(section):
+        requested.append(section["title"])
+        feature = section["text"].splitlines()[-1].strip()
+        return [make_case(f"{feature} works", "Do it"), make_case(f"{feature} fails", "Break it")]
+
+    monkeypatch.setattr(generate_test_plan, "generate_section_test_cases", fake_generate)
+
+    def plan(text):
+        state = {"sections": split_requirement(text), "export_path": export_path}
+        generate_test_plan.export_tests(asyncio.run(generate_test_plan.generate_test_cases(state)))
+        return {case["test_title"]: case["test_case_id"] for case in iter_test_cases(export_path)}
+
+    first = plan("# Login\nLogin\n\n# Search\nSearch\n")
+    assert first == {"Login works": 1, "Login fails": 2, "Search works": 3, "Search fails": 4}
+
+    requested.clear()
+    second = plan("# Login\nLogin  \n\n# Search\nSearch by name\n")
+    assert requested == ["Search"]
+    assert second == {"Login works": 1, "Login fails": 2, "Search by name works": 5, "Search by name fails": 6}
+
+
+def test_previous_export_is_only_replaced_by_the_export_node(tmp_path, monkeypatch):
+    export_path = str(tmp_path / "test_cases.csv")
+    (tmp_path / "test_cases.csv").write_text("test_case_id,test_title\nOld case\n")
+
+    async def fake_generate(section):
+        return [VALID_LOGIN]
+
+    monkeypatch.setattr(generate_test_plan, "generate_section_test_cases", fake_generate)
+    state = {"sections": split_requirement("# Login\nLogin\n"), "export_path": export_path, "regenerate_all": True}
+    state = asyncio.run(generate_test_plan.generate_test_cases(state))
+    assert (tmp_path / "test_cases.csv").read_text() == "test_case_id,test_title\nOld case\n"
+
+    generate_test_plan.export_tests(state)
+    assert [case["test_title"] for case in iter_test_cases(export_path)] == [VALID_LOGIN["test_title"]]
@@ -0,0 +1,39 @@
+import pytest
+from langchain_core.outputs import Generation
+
+from llm_cache import CacheMissError, DiskLLMCache, build_llm_cache
+
+
+LLM = "model=llama-3.1-8b-instant temperature=0"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskLLMCache(str(tmp_path / "cache.sqlite"), max_bytes=10 ** 6)
+    cache.update("first", LLM, [Generation(text="one")])
+    cache.update("second", LLM, [Generation(text="two")])
+    entry_size = cache.stats()["bytes"] // 2
+    assert cache.lookup("first", LLM)[0].text == "one"  # now more recent than "second"
+
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    cache.update("third", LLM, [Generation(text="six")])
+    assert cache.lookup("second", LLM) is None
+    assert cache.lookup("first", LLM)[0].text == "one"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_replay_serves_recordings_and_fails_on_a_miss(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    DiskLLMCache(path).update("recorded", LLM, [Generation(text="answer")])
+
+    replay = build_llm_cache("replay", path, 10 ** 6)
+    assert replay.lookup("recorded", LLM)[0].text == "answer"
+    with pytest.raises(CacheMissError):
+        replay.lookup("recorded", LLM + " max_tokens=10")  # another configuration is another key
+    replay.update("new", LLM, [Generation(text="ignored")])
+    assert replay.stats()["entries"] == 1
+
+
+def test_invalid_mode_is_rejected(tmp_path):
+    assert build_llm_cache("off", str(tmp_path / "cache.sqlite"), 10 ** 6) is None
+    with pytest.raises(ValueError):
+        build_llm_cache("record", str(tmp_path / "cache.sqlite"), 10 ** 6)
@@ -0,0 +1,35 @@
+from locator_check import extract_locators, verify_locators
+
+
+PAGE = ('<html><body><form id="search"><input name="q" class="field"><input name="zip" class="field">'
+        '<button type="submit" id="search-button">Search</button></form>'
+        '<a href="/cart">Cart</a></body></html>')
+
+
+def test_present_unique_locators_pass():
+    code = ('driver.find_element(By.NAME, "q").send_keys("shoes")\n'
+            'driver.find_element(By.XPATH, "//button[@id=\'search-button\']")\n'
+            'driver.find_element(By.LINK_TEXT, "Cart")')
+    assert verify_locators(code, PAGE) == []
+
+
+def test_missing_locator_suggests_candidates():
+    [issue] = verify_locators('driver.find_element(By.ID, "search-btn").click()', PAGE)
+    assert issue.problem == "missing"
+    assert any("search-button" in candidate for candidate in issue.candidates)
+
+
+def test_ambiguous_and_invalid_locators_are_reported():
+    issues = verify_locators('driver.find_element(By.CLASS_NAME, "field")\n'
+                             'driver.find_elements(By.CLASS_NAME, "field")\n'
+                             'driver.find_element(By.XPATH, "//input[")', PAGE)
+    assert [(issue.locator.line, issue.problem.split(" ")[0]) for issue in issues] == [(1, "ambiguous"), (3, "invalid")]
+    assert issues[0].matches == 2
+
+
+def test_locators_after_a_page_change_or_inside_waits_are_skipped():
+    code = ('WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "results")))\n'
+            'driver.find_element(By.ID, "search-button").click()\n'
+            'driver.find_element(By.ID, "results-count")')
+    assert [locator.value for locator in extract_locators(code)] == ["search-button"]
+    assert verify_locators(code, PAGE) == []
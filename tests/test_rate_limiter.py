@@ -0,0 +1,81 @@
+import asyncio
+import time
+
+import groq
+import httpx
+import pytest
+from langchain_core.messages import HumanMessage
+from langchain_groq import ChatGroq
+
+import groq_client
+import rate_limiter
+from groq_client import RateLimitedChatGroq
+from rate_limiter import RateLimiter
+
+
+def test_throttle_halves_the_limit_and_pauses_callers():
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=8, latency_target_s=0)
+    assert limiter.acquire_sync(100) < 0.05
+    limiter.release(100, 120, 0.1, throttled=True, retry_after_s=0.2)
+    assert limiter.limit == 4
+    started = time.monotonic()
+    limiter.acquire_sync(100)
+    assert time.monotonic() - started >= 0.15
+    stats = limiter.stats()
+    assert stats["throttled"] == 1 and stats["in_flight"] == 1
+    assert stats["requests_left"] is None and stats["tokens_left"] is None
+
+
+def test_request_budget_blocks_until_the_deadline():
+    limiter = RateLimiter(rpm=1, tpm=0, max_concurrency=8, latency_target_s=0)
+    limiter.acquire_sync(10)
+    limiter.release(10, 10, 0.1)
+    with pytest.raises(TimeoutError):
+        limiter.acquire_sync(10, deadline=time.monotonic() + 0.2)
+
+
+def test_token_budget_is_settled_against_actual_usage():
+    limiter = RateLimiter(rpm=0, tpm=1000, max_concurrency=8, latency_target_s=0)
+    limiter.acquire_sync(100)
+    limiter.release(100, 400, 0.1)
+    assert limiter.stats()["tokens_left"] == pytest.approx(600, abs=5)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=2, latency_target_s=0)
+    monkeypatch.setattr(rate_limiter, "_limiter", limiter)
+    return limiter
+
+
+@pytest.fixture
+def llm():
+    return RateLimitedChatGroq(model="llama-3.1-8b-instant", api_key="test", max_retries=0)
+
+
+def test_cancelled_call_releases_its_slot(monkeypatch, limiter, llm):
+    async def hang(self, *args, **kwargs):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(ChatGroq, "_agenerate", hang)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(llm._agenerate([HumanMessage(content="hi")]), 0.05))
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.limit == 2
+
+
+def test_no_retry_back_off_past_the_deadline(monkeypatch, limiter, llm):
+    calls = []
+
+    def fail(self, *args, **kwargs):
+        calls.append(1)
+        raise groq.APIConnectionError(request=httpx.Request("POST", "https://api.groq.com"))
+
+    monkeypatch.setattr(ChatGroq, "_generate", fail)
+    monkeypatch.setattr(groq_client.config, "LLM_DEADLINE_S", 0.5)
+    monkeypatch.setattr(groq_client.config, "LLM_MAX_RETRIES", 3)
+    with pytest.raises(groq.APIConnectionError):
+        llm._generate([HumanMessage(content="hi")])
+    # Attempt 0 backs off 1s, which already exceeds the 0.5s deadline
+    assert len(calls) == 1
+    assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,37 @@
+from requirement_sections import split_requirement
+
+
+DOC = ("Shop requirements, draft 2.\n\n"
+       "User Story 1: Search\nAs a shopper I search products by name.\n\n"
+       "## Checkout\nAs a shopper I pay by card.\n")
+
+
+def test_one_section_per_story_with_the_preamble_in_the_first():
+    sections = split_requirement(DOC)
+    assert [section["title"] for section in sections] == ["Shop requirements, draft 2.", "Checkout"]
+    assert "User Story 1: Search" in sections[0]["text"]
+
+
+def test_hash_ignores_whitespace_only_edits():
+    before = split_requirement(DOC)
+    after = split_requirement(DOC.replace("pay by card.", "pay   by\ncard.  "))
+    assert [section["hash"] for section in after] == [section["hash"] for section in before]
+
+
+def test_long_sections_are_split_at_paragraphs_and_keep_their_heading():
+    paragraphs = "\n\n".join(f"Rule {i}: " + "x" * 40 for i in range(6))
+    sections = split_requirement("# Limits\n" + paragraphs, max_chars=100)
+    assert len(sections) > 1
+    assert all(section["text"].startswith("# Limits") for section in sections)
+    assert sum(section["text"].count("Rule ") for section in sections) == 6
+
+
+def test_no_part_exceeds_the_limit_without_blank_lines():
+    bullets = "\n".join(f"- The export includes column {i} with its label" for i in range(2000))
+    text = "# Export\n" + bullets + "\n- " + "y" * 15000
+    sections = split_requirement(text, max_chars=6000)
+    assert len(sections) > 10
+    assert max(len(section["text"]) for section in sections) <= 6000
+    assert all(section["text"].startswith("# Export") for section in sections)
+    assert sum(section["text"].count("- The export") for section in sections) == 2000
+    assert sum(section["text"].count("y") for section in sections) == 15000
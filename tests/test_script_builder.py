@@ -0,0 +1,56 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from script_builder import (derive_test_name, make_action_block, previous_actions_context, render_test_module,
+                            write_test_module)
+
+
+BLOCKS = [make_action_block(0, 'driver.find_element(By.ID, "q").send_keys("shoes")', "Type shoes", screenshot=False)]
+
+
+def test_test_module_has_no_dom_capture_helpers():
+    module = render_test_module("http://fixture.test/", BLOCKS, "test_search", "run-1", backend="selenium")
+    for helper in ("get_page_dom", "open_browser_and_navigate", "launch_browser", "close_browser", "driver_pool"):
+        assert helper not in module
+    assert "def run_actions(driver):" in module and "def test_search(driver):" in module
+
+
+def test_suite_collects_without_pythonpath(tmp_path):
+    pytest.importorskip("selenium")
+    module = render_test_module("http://fixture.test/", BLOCKS, "test_search", "run-1", backend="selenium")
+    write_test_module(str(tmp_path), "test_search_1.py", module)
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    proc = subprocess.run([sys.executable, "-m", "pytest", "--collect-only", "-q", "-p", "no:cacheprovider", str(tmp_path)],
+                          cwd=str(tmp_path), env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "test_search_1.py::test_search" in proc.stdout
+
+
+def test_derived_names_are_short_and_skip_filler_words():
+    assert derive_test_name("Verify that the search results appear for shoes", []) == "search"
+    assert derive_test_name("Add to cart", []) == "add_cart"
+    assert derive_test_name("Test the page", ["Open login form"]) == "open_login"
+    assert derive_test_name("", []) == "scenario"
+
+
+def test_previous_actions_context_keeps_only_the_last_blocks_verbatim():
+    blocks = [make_action_block(i, f"step_{i}()", f"Action {i} text", screenshot=False) for i in range(5)]
+    context = previous_actions_context(blocks, window=2, summaries=5)
+    assert "# Action 0 (done): Action 0 text" in context and "step_0()" not in context
+    assert "step_3()" in context and "step_4()" in context
+    assert previous_actions_context(blocks, window=0, summaries=5).count("(done)") == 5
+
+
+def test_previous_actions_context_stays_flat_as_the_scenario_grows():
+    def context(count):
+        blocks = [make_action_block(i, "driver.find_element(By.ID, 'next').click()", "Go to the next step",
+                                    screenshot=False) for i in range(count)]
+        return previous_actions_context(blocks, window=3, summaries=5)
+
+    assert context(40).startswith("# Actions 0-31 done\n")
+    sizes = [len(context(count)) for count in (20, 60, 90)]
+    assert max(sizes) - min(sizes) <= 20  # only the action numbers get longer
+    assert context(20).count("\n") == context(90).count("\n")
@@ -0,0 +1,26 @@
+import asyncio
+import os
+
+import config
+import test_executor
+
+PASSING = "def test_generated():\n    assert True\n"
+FAILING = "def test_generated():\n    # Action 0\n    assert False\n"
+
+
+def run(name, script):
+    return asyncio.run(test_executor.run_generated_test(name, script, timeout=60))
+
+
+def test_passing_workdirs_are_removed_and_failing_ones_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TEST_RUN_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "TEST_KEEP_RUNS", 1)
+
+    passed = run("test_pass", PASSING)
+    assert passed["status"] == "passed" and passed["workdir"] is None
+
+    first = run("test_fail", FAILING)
+    second = run("test_fail", FAILING)  # a second asyncio.run gets its own worker semaphore
+    assert first["status"] == second["status"] == "failed"
+    assert second["failing_step"] == 0
+    assert os.listdir(tmp_path) == [os.path.basename(second["workdir"])]
@@ -0,0 +1,44 @@
+import asyncio
+
+import browser_backend
+import config
+from dom_store import DomCapture
+from fake_llm import E2E_RESPONSES, FakeChatModel
+from workflow import route_after_validation, run_workflow
+
+
+PAGE = '<html><body><input id="q"><button data-testid="search-button">Search</button></body></html>'
+
+
+class OfflineBackend(browser_backend.SeleniumBackend):
+    """Selenium prompts and validation, with a static page instead of a browser."""
+
+    async def capture_dom(self, state):
+        return DomCapture(PAGE, PAGE)
+
+    async def apply_action(self, session_id, code):
+        pass
+
+    async def close_session(self, session_id):
+        pass
+
+
+def test_route_gives_up_after_repairs_and_regenerations():
+    state = {"error_message": "bad", "repair_attempts": config.MAX_REPAIR_ATTEMPTS,
+             "regenerations": config.MAX_REGENERATIONS, "current_action": 1, "actions": ["a", "b"]}
+    assert route_after_validation(state) == "post_process"
+    assert route_after_validation(dict(state, repair_attempts=0)) == "repair"
+
+
+def test_abandoned_action_makes_the_run_incomplete(monkeypatch):
+    # The click is never valid Selenium code, so it is repaired, regenerated and finally abandoned
+    responses = [(r"<Action>:\s*Click", "print('no browser call')")] + E2E_RESPONSES
+    monkeypatch.setattr(browser_backend, "_backend", OfflineBackend())
+    monkeypatch.setattr(config, "_llm", FakeChatModel(responses=responses))
+
+    result = asyncio.run(run_workflow("search for shoes", "http://fixture.test/"))
+
+    assert result["abandoned_action"]["index"] == 2
+    assert result["test_result"]["status"] == "incomplete"
+    assert result["test_result"]["failing_step"] == 2
+    assert len(result["action_blocks"]) == 2